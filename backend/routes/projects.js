@@ -37,18 +37,52 @@ router.get('/', async (req, res) => {
   } catch (err) { res.status(500).json({ error: err.message }); }
 });
 
+// ✅ STREAMING VIEW (HTTP Range support for media seeking)
 router.get('/:ipfsHash/view', (req, res) => {
-  cloudClient.GetProjectDocument({ token: "public", ipfs_hash: req.params.ipfsHash }, (err, response) => {
-    if (err || !response.data) return res.status(404).send("File not found");
-    const filename = response.filename || "file.bin";
-    let contentType = 'application/octet-stream';
-    if (filename.endsWith('.pdf')) contentType = 'application/pdf';
-    if (filename.endsWith('.mp4')) contentType = 'video/mp4';
-    if (filename.endsWith('.png')) contentType = 'image/png';
-    res.setHeader('Content-Type', contentType);
-    res.setHeader('Content-Disposition', `inline; filename="${filename}"`);
-    res.send(response.data);
+  let offset = 0, length = 0, partial = false;
+  const range = /^bytes=(\d+)-(\d*)$/.exec(req.headers.range || '');
+  if (range) {
+    partial = true;
+    offset = parseInt(range[1], 10);
+    if (range[2]) length = parseInt(range[2], 10) - offset + 1;
+    if (range[2] && length <= 0) return res.status(416).send("Range not satisfiable");
+  }
+
+  const call = cloudClient.StreamProjectDocument({ token: "public", ipfs_hash: req.params.ipfsHash, offset, length });
+  let started = false;
+  call.on('data', (segment) => {
+    if (!started) {
+      started = true;
+      const size = Number(segment.size);
+      const end = length ? Math.min(offset + length, size) : size;
+      const filename = segment.filename || "file.bin";
+      let contentType = 'application/octet-stream';
+      if (filename.endsWith('.pdf')) contentType = 'application/pdf';
+      if (filename.endsWith('.mp4')) contentType = 'video/mp4';
+      if (filename.endsWith('.png')) contentType = 'image/png';
+      res.setHeader('Content-Type', contentType);
+      res.setHeader('Content-Disposition', `inline; filename="${filename}"`);
+      res.setHeader('Accept-Ranges', 'bytes');
+      res.setHeader('Content-Length', end - offset);
+      if (partial && size > 0) {
+        res.status(206);
+        res.setHeader('Content-Range', `bytes ${offset}-${end - 1}/${size}`);
+      }
+    }
+    // Backpressure: stop pulling segments while the HTTP socket is full
+    if (!res.write(segment.data)) {
+      call.pause();
+      res.once('drain', () => call.resume());
+    }
   });
+  call.on('end', () => res.end());
+  call.on('error', (err) => {
+    if (started) return res.destroy(err);
+    if (err.code === grpc.status.OUT_OF_RANGE) return res.status(416).send("Range not satisfiable");
+    if (err.code === grpc.status.CANCELLED) return;
+    res.status(404).send("File not found");
+  });
+  res.on('close', () => call.cancel());
 });
 
 // ✅ CREATE PROJECT (STREAMING)
@@ -79,6 +113,7 @@ router.post('/', authenticateToken, upload.single('file'), async (req, res) => {
             project_id: "new",
             filename: req.file.originalname,
             proposer_wallet: req.body.proposer,
+            file_size: req.file.size,
             data: chunk
         });
     }
@@ -111,7 +146,14 @@ router.post('/:id/request-delete', authenticateToken, async (req, res) => {
 });
 
 router.delete('/:id', authenticateToken, async (req, res) => {
-  await Project.findByIdAndDelete(req.params.id);
+  const project = await Project.findByIdAndDelete(req.params.id);
+  // Identical uploads share one cloud document: free it only when no other project uses it
+  if (project && project.ipfsHash && !(await Project.exists({ ipfsHash: project.ipfsHash }))) {
+    cloudClient.DeleteDocument({ token: req.user.cloudToken, ipfs_hash: project.ipfsHash }, (err, response) => {
+      if (err) console.error("Cloud Delete Error:", err);
+      else console.log(`🗑️ Cloud document ${project.ipfsHash}: ${response.result}`);
+    });
+  }
   res.json({ message: "Deleted" });
 });
 
@@ -0,0 +1,204 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent import futures
+
+import grpc
+import psutil
+
+import cloud_pb2
+import cloud_pb2_grpc
+
+# Storage benchmark over gRPC. For every node count a fresh cluster is started in a scratch
+# directory (its own disk file and metadata): a CivicCloudManager process serving gRPC plus
+# N CivicNode processes. Clients then drive StoreProjectDocument / GetProjectDocument for
+# every file size x chunk size x client concurrency ("auto" is the adaptive chunk size
+# policy), deleting the documents after each row. Each row reports MB/s, p50/p99 latency
+# per operation and peak RSS per process; rows print as JSON lines and --out writes the
+# whole report (with the commit and host it ran on) as one JSON document.
+#
+#   python bench_cloud.py --nodes 1,3 --sizes-mb 16,128 --chunk-mb auto,4,16 --clients 1,4 --out bench.json
+#
+# Manager UDP port 9001 is fixed, so one benchmark (or cluster) per host at a time.
+
+SEND_PIECE = 4 * 1024 * 1024 # Upload message size (the backend streams 4MB)
+MAX_MESSAGE = 2147483647
+
+def serve_cluster(node_count, port):
+    # Child process: manager + node_count nodes + gRPC server, until terminated
+    import cloud_civic
+    manager = cloud_civic.CivicCloudManager()
+    for n in range(1, node_count + 1): manager.spawn_node(n, stdout=subprocess.DEVNULL)
+    cloud_civic.serve(manager, port).wait_for_termination()
+
+class Cluster:
+    def __init__(self, node_count, port, workdir):
+        self.node_count, self.port = node_count, port
+        log = open(os.path.join(workdir, "cluster.log"), "wb")
+        self.proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve-nodes", str(node_count), "--port", str(port)],
+                                     cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        self.channel = grpc.insecure_channel(f"127.0.0.1:{port}", options=[('grpc.max_receive_message_length', MAX_MESSAGE), ('grpc.max_send_message_length', MAX_MESSAGE)])
+        self.stub = cloud_pb2_grpc.CivicCloudServiceStub(self.channel)
+
+    def wait_ready(self, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None: raise RuntimeError("Cluster process exited during startup (see cluster.log)")
+            try:
+                nodes = self.stub.GetAdminStats(cloud_pb2.AdminStatsRequest(), timeout=5).nodes
+                if sum(n.status == "Online" for n in nodes) == self.node_count:
+                    time.sleep(0.5) # Let the slab assignments land
+                    return
+            except grpc.RpcError: pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{self.node_count} nodes did not come online in {timeout}s")
+
+    def processes(self):
+        # {"manager": Process, "node <pid>": Process, ...}
+        try:
+            manager = psutil.Process(self.proc.pid)
+            return {"manager": manager, **{f"node {c.pid}": c for c in manager.children()}}
+        except psutil.Error: return {}
+
+    def stop(self):
+        self.channel.close()
+        procs = list(self.processes().values())
+        for p in procs:
+            try: p.terminate()
+            except psutil.Error: pass
+        psutil.wait_procs(procs, timeout=10)
+
+class RssSampler:
+    # Peak resident memory of each cluster process while running
+    def __init__(self, cluster, interval=0.02):
+        self.cluster, self.interval = cluster, interval
+        self.peaks = {}
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        procs = self.cluster.processes()
+        while not self.stop.is_set():
+            for name, proc in procs.items():
+                try: self.peaks[name] = max(self.peaks.get(name, 0), proc.memory_info().rss)
+                except psutil.Error: pass
+            self.stop.wait(self.interval)
+
+    def report(self):
+        nodes = sorted(v for k, v in self.peaks.items() if k != "manager")
+        return {"manager_peak_rss_mb": round(self.peaks.get("manager", 0) / 2**20), "node_peak_rss_mb": [round(v / 2**20) for v in nodes]}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+def upload(stub, data, tag, chunk_size, compression):
+    # The first 16 bytes become the tag, so dedup doesn't turn repeats into no-ops
+    head = tag.to_bytes(16, 'big')[:len(data)]
+    def requests():
+        view = memoryview(data)
+        for i in range(0, max(1, len(view)), SEND_PIECE):
+            piece = head + view[len(head):SEND_PIECE] if i == 0 else view[i:i + SEND_PIECE]
+            yield cloud_pb2.StoreProjectDocumentRequest(filename=f"bench{tag}.bin", file_size=len(data), chunk_size=chunk_size, compression=compression, data=bytes(piece))
+    t = time.perf_counter()
+    reply = stub.StoreProjectDocument(requests())
+    elapsed = time.perf_counter() - t
+    if reply.result != "Success" or reply.size != len(data): raise RuntimeError(f"Upload failed: {reply.result}")
+    return reply.ipfs_hash, elapsed
+
+def download(stub, ipfs_hash, size):
+    t = time.perf_counter()
+    reply = stub.GetProjectDocument(cloud_pb2.GetProjectDocumentRequest(ipfs_hash=ipfs_hash))
+    elapsed = time.perf_counter() - t
+    if len(reply.data) != size: raise RuntimeError(f"Read back {len(reply.data)} of {size} bytes")
+    return elapsed
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, len(ordered) * pct // 100)]
+
+def phase(cluster, clients, jobs, fn):
+    # Runs fn(job) for every job on `clients` threads -> (wall seconds, results, RSS report)
+    with RssSampler(cluster) as rss, futures.ThreadPoolExecutor(clients) as pool:
+        t = time.perf_counter()
+        results = list(pool.map(fn, jobs))
+        wall = time.perf_counter() - t
+    return wall, results, rss.report()
+
+def stats(op, size, wall, latencies, rss):
+    mb = size * len(latencies) / 1e6
+    return {f"{op}_MBps": round(mb / wall, 1), f"{op}_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            f"{op}_p99_ms": round(percentile(latencies, 99) * 1000, 1), f"{op}_rss": rss}
+
+def run_row(cluster, size, chunk_size, clients, ops, compression, tags):
+    stub = cluster.stub
+    data = os.urandom(size)
+    jobs = [next(tags) for _ in range(clients * ops)]
+    wall, ups, rss = phase(cluster, clients, jobs, lambda tag: upload(stub, data, tag, chunk_size, compression))
+    row = stats("upload", size, wall, [t for _, t in ups], rss)
+    hashes = [h for h, _ in ups]
+    wall, downs, rss = phase(cluster, clients, hashes, lambda h: download(stub, h, size))
+    row.update(stats("download", size, wall, downs, rss))
+    for h in hashes: stub.DeleteDocument(cloud_pb2.DeleteDocumentRequest(ipfs_hash=h)) # Keep the disk from filling up
+    return row
+
+def git_commit():
+    try: return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+def int_list(text):
+    return [int(x) for x in text.split(",")]
+
+def main():
+    ap = argparse.ArgumentParser(description="CivicChain cloud storage benchmark (gRPC, local cluster)")
+    ap.add_argument("--nodes", type=int_list, default=[1, 3], help="comma separated node counts")
+    ap.add_argument("--sizes-mb", default="1,16,128", help="comma separated file sizes in MB")
+    ap.add_argument("--chunk-mb", default="auto,4,16", help="comma separated chunk sizes in MB; auto = adaptive policy")
+    ap.add_argument("--clients", type=int_list, default=[1, 4], help="comma separated client concurrencies")
+    ap.add_argument("--ops", type=int, default=4, help="uploads (and downloads) per client per row")
+    ap.add_argument("--compression", default="none")
+    ap.add_argument("--port", type=int, default=9102, help="gRPC port for the benchmark cluster")
+    ap.add_argument("--out", help="write the full JSON report here")
+    ap.add_argument("--serve-nodes", type=int, help=argparse.SUPPRESS) # Internal: run as the cluster process
+    args = ap.parse_args()
+    if args.serve_nodes: return serve_cluster(args.serve_nodes, args.port)
+
+    sizes = [int(float(s) * 2**20) for s in args.sizes_mb.split(",")]
+    chunk_sizes = [0 if c == "auto" else int(float(c) * 2**20) for c in args.chunk_mb.split(",")]
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "cpus": os.cpu_count(), "started": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": {k: v for k, v in vars(args).items() if k != "serve_nodes"},
+              "results": []}
+    tags = itertools.count(1)
+    for node_count in args.nodes:
+        workdir = tempfile.mkdtemp(prefix="civic_bench_")
+        cluster = Cluster(node_count, args.port, workdir)
+        try:
+            cluster.wait_ready()
+            for size, chunk_size, clients in itertools.product(sizes, chunk_sizes, args.clients):
+                row = {"nodes": node_count, "size_mb": round(size / 2**20, 2), "chunk_mb": "auto" if not chunk_size else round(chunk_size / 2**20, 2),
+                       "clients": clients, "ops": clients * args.ops, "compression": args.compression}
+                try: row.update(run_row(cluster, size, chunk_size, clients, args.ops, args.compression, tags))
+                except (grpc.RpcError, RuntimeError) as e: row["error"] = str(e)
+                report["results"].append(row)
+                print(json.dumps(row), flush=True)
+        finally:
+            cluster.stop()
+            shutil.rmtree(workdir, ignore_errors=True)
+    if args.out:
+        with open(args.out, "w") as f: json.dump(report, f, indent=1)
+    return 1 if any("error" in r for r in report["results"]) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
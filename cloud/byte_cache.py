@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+
+class ByteLRUCache:
+    # Least-recently-used cache bounded by the total size of its values, not their count.
+    # Values larger than max_item are never admitted, so one huge read can't flush everything.
+    # Cached values are shared between readers and must be treated as read-only.
+    def __init__(self, capacity, max_item=None):
+        self.capacity = capacity
+        self.max_item = capacity if max_item is None else max_item
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, count=True):
+        # count=False for a second look that shouldn't be counted again
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                if count: self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            if count: self.hits += 1
+            return value
+
+    def admits(self, size):
+        return 0 < size <= self.max_item
+
+    def put(self, key, value):
+        if not self.admits(len(value)): return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None: self.bytes -= len(old)
+            self.entries[key] = value
+            self.bytes += len(value)
+            while self.bytes > self.capacity:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def discard(self, key):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None: self.bytes -= len(old)
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "bytes": self.bytes, "capacity": self.capacity, "entries": len(self.entries)}
@@ -0,0 +1,52 @@
+import lzma
+import zlib
+from collections import namedtuple
+
+try: import zstandard
+except ImportError: zstandard = None
+
+# === CHUNK COMPRESSION ===
+# A document may be stored compressed; each chunk is compressed on its own, so it can be
+# read back alone. Chunks that don't shrink (media, archives) are stored as they are, and a
+# cheap sample test skips compressing those at all. Ids go on the wire (WRITE arg0).
+CODEC_IDS = {"none": 0, "zlib": 1, "lzma": 2, "zstd": 3}
+CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+SAMPLE_SIZE = 64 * 1024 # Bytes per sample
+SAMPLES = 4             # Samples spread evenly over the chunk
+MIN_SAVING = 0.10       # Fraction a chunk (and its samples) must shrink by to be stored compressed
+
+# Bytes as stored on a node: codec name ("none" = raw) and the uncompressed size
+Packed = namedtuple('Packed', 'data codec raw_size')
+
+def available(codec):
+    return codec in CODEC_IDS and (codec != "zstd" or zstandard is not None)
+
+def compress(data, codec):
+    # zlib at its fastest level for upload speed, lzma when disk space matters more
+    if codec == "zlib": return zlib.compress(data, 1)
+    if codec == "lzma": return lzma.compress(data, preset=0)
+    if codec == "zstd": return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unknown codec {codec}")
+
+def decompress(data, codec):
+    if codec == "zlib": return zlib.decompress(data)
+    if codec == "lzma": return lzma.decompress(data)
+    if codec == "zstd": return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown codec {codec}")
+
+def looks_compressible(data):
+    # Fast zlib level 1 over a few samples: already-compressed data barely shrinks
+    view = memoryview(data)
+    if len(view) <= SAMPLE_SIZE * SAMPLES: sample = view
+    else:
+        step = (len(view) - SAMPLE_SIZE) // (SAMPLES - 1)
+        sample = b"".join(view[i * step:i * step + SAMPLE_SIZE] for i in range(SAMPLES))
+    return len(zlib.compress(sample, 1)) <= len(sample) * (1 - MIN_SAVING)
+
+def pack(data, codec, sample=True):
+    # -> Packed; raw bytes unless the codec saves at least MIN_SAVING. sample=False skips
+    # the sample test (re-packing a chunk already known to compress).
+    if codec == "none" or not len(data) or (sample and not looks_compressible(data)): return Packed(data, "none", len(data))
+    out = compress(data, codec)
+    if len(out) > len(data) * (1 - MIN_SAVING): return Packed(data, "none", len(data))
+    return Packed(out, codec, len(data))
@@ -5,44 +5,174 @@ import cloud_pb2_grpc
 import json
 import threading
 import socket
-import struct
-import base64
 import hashlib
+import itertools
+import queue
 import time
 import os
+import sys
 import subprocess
-import psutil 
+from collections import deque
+import node_protocol as proto
+from metadata_store import MetadataStore
 from dotenv import load_dotenv
 from utils import generate_otp, send_otp_email, process_ids_file
+from params import MAX_NODES_PER_FILE, REPLICATION_FACTOR, STORAGE_MODE, EC_DATA_SHARDS, EC_PARITY_SHARDS
+from params import CHUNK_SIZE, MIN_CHUNK_SIZE, MAX_CHUNK_SIZE, CHUNKS_PER_NODE
+from params import PLACEMENT_POLICY, COMPRESSION
+from erasure import ErasureCode
+from byte_cache import ByteLRUCache
+from rebalancer import Rebalancer
+from health import FailureDetector, CircuitBreaker, HEARTBEAT_INTERVAL
+import placement
+import chunk_codec
+import metrics
 
 load_dotenv()
 
 # === CONFIGURATION ===
 DISK_PATH = "civic_cloud_disk.vfat"
-TOTAL_DISK_SIZE = 3 * 1024 * 1024 * 1024 # 3GB
+METADATA_PATH = "civic_cloud_meta.db"
+TOTAL_DISK_SIZE = 3 * 1024 * 1024 * 1024 # 3GB to start; grows as nodes are added
 NODE_COUNT = 3
-PARTITION_SIZE = TOTAL_DISK_SIZE // NODE_COUNT
+PARTITION_SIZE = TOTAL_DISK_SIZE // NODE_COUNT # Space each node may claim
+# Nodes are granted disk space in slabs, one more whenever a write finds them full
+SLAB_SIZE = 256 * 1024 * 1024
 
-# ✅ 300MB CHUNKS for storage distribution
-CHUNK_SIZE = 300 * 1024 * 1024 
+# Chunk buffers held in memory while an upload streams in (one filling, the rest in flight)
+INGEST_BUFFERS = 4
+# Largest piece of a document read from a node / sent in one streamed message
+STREAM_SEGMENT_SIZE = 4 * 1024 * 1024
+
+def choose_chunk_size(file_size, node_count):
+    # Enough chunks to keep every node busy, but none so small that per-chunk overhead dominates
+    if not file_size: return CHUNK_SIZE
+    size = file_size // max(1, node_count * CHUNKS_PER_NODE)
+    size = -(-size // (1024 * 1024)) * 1024 * 1024 # Whole MB
+    return max(MIN_CHUNK_SIZE, min(size, MAX_CHUNK_SIZE))
+
+# Concurrent chunk transfers (overall / per node) and segments read ahead of the consumer
+MAX_INFLIGHT_TRANSFERS = 8
+MAX_INFLIGHT_PER_NODE = 2
+READ_AHEAD_SEGMENTS = 8
+
+# Replica reads: a hedged request goes to the next replica once the first has been
+# outstanding longer than this percentile of that node's recent read latencies
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_DELAY = 0.02 # Seconds
+LATENCY_WINDOW = 200   # Samples kept per node
+LATENCY_FAILURE_PENALTY = 1.0 # Seconds charged to a node for a failed read
+
+# Placement weight floor, so a nearly full node still ranks (it is tried last, not never)
+MIN_PLACEMENT_WEIGHT = 0.01
+
+# Recently read document segments kept in manager memory (chunks are immutable, so never stale)
+SEGMENT_CACHE_BYTES = int(os.getenv("CIVIC_SEGMENT_CACHE_BYTES", 256 * 1024 * 1024))
+# Seconds between sweeps for unreferenced chunks left on nodes that were offline at delete time
+GC_INTERVAL = 300
 
 MANAGER_UDP_PORT = 9001
 GRPC_PORT = 9002
+GRPC_WORKERS = 10
+METRICS_PORT = int(os.getenv("CIVIC_METRICS_PORT", 9003)) # Prometheus text at http://<host>:9003/metrics
+NODE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage_virtual_node.py")
+
+class TransferEngine:
+    # Bounded thread pool for node transfers. The caller blocks in submit() while the
+    # target node already has `per_node` transfers in flight, which also throttles producers.
+    def __init__(self, total=MAX_INFLIGHT_TRANSFERS, per_node=MAX_INFLIGHT_PER_NODE):
+        self.pool = futures.ThreadPoolExecutor(total, thread_name_prefix="transfer")
+        self.per_node = per_node
+        self.node_slots = {}
+        self.lock = threading.Lock()
+
+    def submit(self, node_id, fn, *args, wait=True):
+        # With wait=False returns None instead of blocking on a saturated node
+        with self.lock:
+            slot = self.node_slots.setdefault(str(node_id), threading.BoundedSemaphore(self.per_node))
+        if not slot.acquire(blocking=wait): return None
+        try: future = self.pool.submit(fn, *args)
+        except:
+            slot.release()
+            raise
+        future.add_done_callback(lambda _: slot.release())
+        return future
+
+class LatencyTracker:
+    # Recent read latency per node: an EWMA to rank replicas and a window for hedge delays
+    def __init__(self):
+        self.samples = {}
+        self.ewma = {}
+        self.lock = threading.Lock()
+
+    def record(self, node_id, seconds):
+        with self.lock:
+            self.samples.setdefault(node_id, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            self.ewma[node_id] = 0.8 * self.ewma.get(node_id, seconds) + 0.2 * seconds
+
+    def rank(self, node_ids, rotate=0):
+        # Fastest first; the rotation spreads ties (e.g. unmeasured nodes) across replicas
+        if not node_ids: return []
+        rotate %= len(node_ids)
+        ordered = node_ids[rotate:] + node_ids[:rotate]
+        with self.lock: return sorted(ordered, key=lambda n: self.ewma.get(n, 0))
+
+    def speeds(self, node_ids):
+        # Relative read speed: 1.0 for the fastest measured node (and unmeasured ones)
+        with self.lock: ewma = {n: self.ewma[n] for n in node_ids if self.ewma.get(n)}
+        best = min(ewma.values(), default=0)
+        return {n: best / ewma[n] if n in ewma else 1.0 for n in node_ids}
+
+    def hedge_delay(self, node_id):
+        with self.lock: window = sorted(self.samples.get(node_id, ()))
+        if not window: return HEDGE_MIN_DELAY
+        return max(HEDGE_MIN_DELAY, window[min(len(window) - 1, len(window) * HEDGE_PERCENTILE // 100)])
+
+def cache_stats(stats):
+    # ByteLRUCache.stats() dict -> CacheStats message
+    return cloud_pb2.CacheStats(**{k: stats.get(k, 0) for k in ("hits", "misses", "evictions", "bytes", "capacity")})
+
+def chunk_data(result):
+    # get_chunk_from_node result -> the bytes, None if the node didn't serve them
+    return None if result is None or isinstance(result, proto.Frame) else result
+
+def chunk_intact(chunk_id, data):
+    # Chunk ids are the sha256 of their bytes (ids from before content addressing can't be checked)
+    return len(chunk_id) != 64 or hashlib.sha256(data).hexdigest() == chunk_id
 
 class CivicCloudManager:
     def __init__(self):
         self.active_nodes = {} 
-        self.file_map = {} 
+        self.meta = MetadataStore(METADATA_PATH) # Documents and chunk placements survive restarts
         self.node_processes = {} 
         self.pending_registrations = {}
         self.credentials = {} 
         self.user_emails = {}
         self.otps = {}
+        self.transfers = TransferEngine()
+        self.latency = LatencyTracker()
+        self.placement = placement.POLICIES[PLACEMENT_POLICY]()
+        self.health = FailureDetector() # Heartbeat silence per node
+        self.breakers = {} # node_id -> CircuitBreaker over calls to that node
+        self.suspects = set()
+        self.segments = ByteLRUCache(SEGMENT_CACHE_BYTES) # (chunk_id, offset, length) -> bytes
+        # Chunks are content-addressed (sha256) and reference counted in self.meta
+        self.inflight_chunks = {} # chunk_id -> Event while its first write is in progress
+        self.chunk_lock = threading.Lock()
+        self.space_lock = threading.Lock() # Slab grants
+        self.repairs = queue.Queue() # (chunk_id, node_id) copies a node found corrupt and dropped
+        self.metrics = metrics.ManagerMetrics()
 
         self.create_disk_if_missing()
         process_ids_file()
         self.load_credentials()
         threading.Thread(target=self.listen_for_nodes, daemon=True).start()
+        threading.Thread(target=self.watch_nodes, daemon=True).start()
+        threading.Thread(target=self.collect_garbage_forever, daemon=True).start()
+        threading.Thread(target=self.repair_forever, daemon=True).start()
+        self.rebalancer = Rebalancer(self)
+        self.rebalancer.start()
+        metrics.Collector(self.metrics, self.process_ids).start()
 
     def create_disk_if_missing(self):
         if not os.path.exists(DISK_PATH):
@@ -71,51 +201,140 @@ class CivicCloudManager:
             try:
                 data, addr = udp.recvfrom(1024)
                 msg = json.loads(data.decode())
-                if msg['type'] == 'join':
-                    self.register_node(msg['id'], msg['port'])
+                if msg['type'] == 'corrupt': self.repairs.put((msg['chunk'], msg['id']))
+                if msg['type'] not in ('join', 'heartbeat'): continue
+                node = self.active_nodes.get(msg['id'])
+                # A heartbeat from a node marked offline (or unknown after a manager restart) rejoins it
+                if msg['type'] == 'join' or not node or node['port'] != msg['port']:
+                    self.register_node(msg['id'], msg['port'], msg.get('extent_end', 0))
+                self.health.heartbeat(msg['id'], msg.get('load'))
             except: pass
 
-    def register_node(self, node_id, tcp_port):
+    def watch_nodes(self):
+        # Suspected nodes are tried last for reads and get no new chunks; dead ones are
+        # dropped from active_nodes (as if stopped) until their heartbeats resume
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            for nid in list(self.active_nodes):
+                if self.health.dead(nid):
+                    print(f"💀 Node {nid} missed its heartbeats, marking it offline")
+                    node = self.active_nodes.pop(nid, None)
+                    if node: node['pool'].close()
+                    self.suspects.discard(nid)
+                elif self.health.suspected(nid) and nid not in self.suspects:
+                    print(f"⚠️ Node {nid} is late with heartbeats (suspect)")
+                    self.suspects.add(nid)
+                elif not self.health.suspected(nid): self.suspects.discard(nid)
+
+    def healthy_nodes(self):
+        # Online, not suspected, and not failing fast
+        return [nid for nid in list(self.active_nodes) if nid not in self.suspects and self.reachable(nid)]
+
+    def reachable(self, node_id):
+        breaker = self.breakers.get(node_id)
+        return node_id in self.active_nodes and (breaker is None or breaker.available())
+
+    def node_call(self, node_id, fn, *args):
+        # Runs fn(node, *args) through the node's circuit breaker; fn returns None on failure
+        node, breaker = self.active_nodes.get(node_id), self.breakers.get(node_id)
+        if not node or not breaker or not breaker.allow(): return None
+        result, started = None, time.perf_counter()
+        self.metrics.node_inflight.inc(node=node_id)
+        try: result = fn(node, *args)
+        finally:
+            self.metrics.node_inflight.inc(-1, node=node_id)
+            self.metrics.node_latency.observe(time.perf_counter() - started, node=node_id, op=fn.__name__)
+            if result is not None: breaker.success()
+            else:
+                self.metrics.node_errors.inc(node=node_id, op=fn.__name__)
+                if breaker.failure(): print(f"🔌 Node {node_id} keeps failing, circuit open for its calls")
+        return result
+
+    def process_ids(self):
+        # Processes the metrics collector samples: this manager and the nodes it spawned
+        return {"manager": os.getpid(), **{f"node{nid}": p.pid for nid, p in list(self.node_processes.items()) if p.poll() is None}}
+
+    def register_node(self, node_id, tcp_port, extent_end=0):
         try:
-            nid = int(node_id)
-            offset = (nid - 1) * PARTITION_SIZE
-            self.active_nodes[node_id] = { 'ip': '127.0.0.1', 'port': tcp_port, 'offset': offset, 'limit': PARTITION_SIZE }
-            self.send_assignment(node_id, offset)
+            old = self.active_nodes.get(node_id)
+            if old: old['pool'].close() # Node restarted on a new port
+            pool = proto.NodeConnectionPool('127.0.0.1', tcp_port)
+            self.breakers[node_id] = CircuitBreaker()
+            self.health.forget(node_id) # Silence is measured from (re)registration
+            self.health.heartbeat(node_id)
+            self.active_nodes[node_id] = { 'id': node_id, 'ip': '127.0.0.1', 'port': tcp_port, 'pool': pool }
+            with self.space_lock:
+                new_node = not self.meta.node_slabs(node_id)
+                if new_node: self.first_slab(node_id, extent_end)
+            self.send_assignment(node_id)
+            if new_node: self.rebalancer.trigger() # Give it a share of the existing data
         except: pass
 
-    def send_assignment(self, node_id, offset):
+    def send_assignment(self, node_id):
         node = self.active_nodes[node_id]
+        layout = json.dumps({"slabs": self.meta.node_slabs(node_id)}).encode()
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect((node['ip'], node['port']))
-            payload = json.dumps({"command": "ASSIGN_PARTITION", "offset": offset, "size": PARTITION_SIZE}).encode()
-            s.send(struct.pack('>I', len(payload)))
-            s.send(payload)
-            s.close()
+            with node['pool'].connection() as s:
+                proto.send_frame(s, proto.ASSIGN_PARTITION, payload=layout)
+                proto.recv_frame(s)
         except: pass
 
+    # --- DISK SPACE ---
+    def first_slab(self, node_id, extent_end):
+        # Nodes 1..NODE_COUNT that already hold data from before slabs existed keep their fixed
+        # partition; everyone else starts with one slab. Caller holds space_lock.
+        legacy = (int(node_id) - 1) * PARTITION_SIZE
+        if extent_end and int(node_id) <= NODE_COUNT and all(o + n <= legacy or o >= legacy + PARTITION_SIZE for o, n in self.meta.all_slabs()):
+            self.meta.add_slab(node_id, legacy, PARTITION_SIZE)
+            print(f"💾 Node {node_id} keeps its partition at {legacy}")
+            return
+        self.grant_slab(node_id)
+
+    def grant_slab(self, node_id):
+        # Lowest free SLAB_SIZE region of the disk, growing the disk file when there is none;
+        # False once the node has its PARTITION_SIZE share. Caller holds space_lock.
+        if sum(n for _, n in self.meta.node_slabs(node_id)) + SLAB_SIZE > PARTITION_SIZE: return False
+        offset = 0
+        for o, n in self.meta.all_slabs():
+            if o - offset >= SLAB_SIZE: break
+            offset = max(offset, o + n)
+        if offset + SLAB_SIZE > os.path.getsize(DISK_PATH):
+            with open(DISK_PATH, "r+b") as f: f.truncate(offset + SLAB_SIZE) # Sparse, like the original
+        self.meta.add_slab(node_id, offset, SLAB_SIZE)
+        print(f"💾 Node {node_id} granted {SLAB_SIZE // (1024 * 1024)}MB slab at disk offset {offset}")
+        return True
+
+    def grow_node(self, node_id, seen_capacity):
+        # A write found node_id full at seen_capacity: grant a slab unless a concurrent write
+        # already did, then resend the layout. False if the node is at its share.
+        with self.space_lock:
+            if sum(n for _, n in self.meta.node_slabs(node_id)) <= seen_capacity and not self.grant_slab(node_id): return False
+        self.send_assignment(node_id)
+        return True
+
     # --- ADMIN ---
     def get_admin_stats(self):
         node_stats = []
         total_used_network = 0
+        usage, raw_usage = self.meta.node_usage(), self.meta.node_raw_usage()
         all_node_ids = sorted(list(set(list(self.active_nodes.keys()) + list(self.node_processes.keys()))), key=lambda x: int(x))
         for nid in all_node_ids:
-            is_online = nid in self.active_nodes
-            chunks_count = 0
-            bytes_used = 0
-            for fhash, meta in self.file_map.items():
-                for c in meta.get('chunks', []):
-                    if str(c['node_id']) == str(nid):
-                        chunks_count += 1
-                        bytes_used += CHUNK_SIZE
+            node = self.active_nodes.get(nid) # May go offline while this runs
+            is_online = node is not None
+            # Online nodes that are late with heartbeats or failing calls stay "Online" (still running)
+            health = "" if not is_online else "failing" if not self.breakers[nid].available() else "suspect" if nid in self.suspects else "ok"
+            chunks_count, bytes_used = usage.get(nid, (0, 0))
             pid = 0
             if nid in self.node_processes:
                 proc = self.node_processes[nid]
                 if proc.poll() is None: pid = proc.pid
+            cache = self.node_counters(nid).get('cache', {}) if is_online else {}
             node_stats.append({
                 "node_id": nid, "status": "Online" if is_online else "Offline", "ip": "127.0.0.1",
-                "port": self.active_nodes[nid]['port'] if is_online else 0, "total_space": PARTITION_SIZE,
-                "used_space": bytes_used, "chunk_count": chunks_count, "pid": pid
+                "port": node['port'] if is_online else 0, "total_space": PARTITION_SIZE,
+                "used_space": bytes_used, "chunk_count": chunks_count, "pid": pid, "cache": cache_stats(cache),
+                "inflight_ops": self.health.load.get(nid, {}).get('ops', 0) if is_online else 0, "health": health,
+                "logical_space": raw_usage.get(nid, 0) # used_space is as stored, after compression
             })
             total_used_network += bytes_used
         return node_stats, total_used_network
@@ -125,12 +344,12 @@ class CivicCloudManager:
             if node_id in self.node_processes:
                 print(f"🛑 Stopping Node {node_id}...")
                 self.node_processes[node_id].terminate()
-                if node_id in self.active_nodes: del self.active_nodes[node_id]
+                if node_id in self.active_nodes: self.active_nodes.pop(node_id)['pool'].close()
+                self.health.forget(node_id)
                 return "Stopped"
         elif action == "START":
             print(f"🚀 Starting Node {node_id}...")
-            cmd = f"python storage_virtual_node.py {node_id}"
-            self.node_processes[node_id] = subprocess.Popen(cmd, shell=True, creationflags=subprocess.CREATE_NEW_CONSOLE)
+            self.spawn_node(node_id)
             return "Started"
         return "Failed"
 
@@ -142,76 +361,496 @@ class CivicCloudManager:
     def remove_node(self, node_id):
         self.toggle_node(node_id, "STOP")
         if node_id in self.node_processes: del self.node_processes[node_id]
+        # Its slabs go back to the pool, so its index (which points into them) goes too
+        with self.space_lock: self.meta.forget_node(node_id)
+        for suffix in (".json", ".journal"):
+            if os.path.exists(f"node_{node_id}_index{suffix}"): os.remove(f"node_{node_id}_index{suffix}")
         return "Deleted"
 
     def get_node_files(self, node_id):
         details = []
-        for fhash, meta in self.file_map.items():
-            for chunk in meta['chunks']:
-                if str(chunk['node_id']) == str(node_id):
-                    details.append({ "filename": meta['filename'], "chunk_id": chunk['chunk_id'], "chunk_index": chunk['index'], "size": CHUNK_SIZE })
+        for row in self.meta.node_chunks(str(node_id)):
+            details.append({ "filename": row['filename'], "chunk_id": row['chunk_id'], "chunk_index": row['idx'], "size": row['size'] })
         return details
 
     # --- STORAGE ---
-    def distribute_file(self, file_data, filename):
-        file_hash = hashlib.sha256(file_data).hexdigest()
-        chunks = [file_data[i:i+CHUNK_SIZE] for i in range(0, len(file_data), CHUNK_SIZE)]
-        chunk_map = []
-        active_ids = list(self.active_nodes.keys())
+    def distribute_file(self, file_data, filename, replicas=0, mode="", ec_k=0, ec_m=0, compression=""):
+        return self.distribute_stream([file_data], filename, replicas, mode, ec_k, ec_m, size_hint=len(file_data), compression=compression)
+
+    def distribute_stream(self, pieces, filename, replicas=0, mode="", ec_k=0, ec_m=0, size_hint=0, chunk_size=0, compression=""):
+        # Fills one chunk buffer at a time from `pieces` and stores each full buffer through
+        # the transfer engine, so chunks reach the nodes in parallel while later bytes are still
+        # arriving. Replicated mode keeps `replicas` copies of every chunk; erasure mode groups
+        # chunks into stripes of ec_k data shards plus ec_m parity shards on distinct nodes.
+        # Without an explicit chunk_size the size comes from choose_chunk_size(size_hint).
+        # With compression each chunk that shrinks enough is stored compressed (chunk_codec).
+        compression = compression or COMPRESSION
+        if not chunk_codec.available(compression): raise Exception(f"Compression {compression} is not available")
+        active_ids = self.healthy_nodes()
         if not active_ids: raise Exception("No Nodes Online")
+        chunk_size = chunk_size or choose_chunk_size(size_hint, len(active_ids))
+        mode = mode or STORAGE_MODE
+        if mode == 'erasure':
+            ec_k, ec_m = ec_k or EC_DATA_SHARDS, ec_m or EC_PARITY_SHARDS
+            if ec_k + ec_m > len(active_ids): raise Exception(f"Erasure coding {ec_k}+{ec_m} needs {ec_k + ec_m} nodes online")
+            code, replicas = ErasureCode(ec_k, ec_m), 1
+        elif mode == 'replicated':
+            ec_k = ec_m = 0
+            replicas = max(1, min(replicas or REPLICATION_FACTOR, MAX_NODES_PER_FILE, len(active_ids)))
+        else: raise Exception(f"Unknown storage mode {mode}")
+        weights = self.placement_weights(active_ids)
+        upload_key = os.urandom(8).hex() # Stripes are placed before their shards' ids are known
+        hasher = hashlib.sha256()
+        free_buffers = queue.Queue()
+        for _ in range(INGEST_BUFFERS): free_buffers.put(None) # Allocated on first use
+        chunk_map, parity_map, failed, pending = [], [], [], []
+        stripes = {} # stripe -> ParityAccumulator
+
+        def stripe_nodes(stripe):
+            # Distinct nodes for the stripe's k + m shards
+            return self.placement.rank(f"{upload_key}:{stripe}", active_ids, weights)[:ec_k + ec_m]
+
+        def store(index, buf, size):
+            try:
+                data = memoryview(buf)[:size]
+                chunk_id = hashlib.sha256(data).hexdigest()
+                if mode == 'erasure':
+                    stripe, shard = divmod(index, ec_k)
+                    node_id = stripe_nodes(stripe)[shard]
+                    holders = self.store_chunk(chunk_id, data, [node_id], 1, required=[node_id], codec=compression)
+                    if stripes[stripe].add(shard, data): store_parity(stripe)
+                else:
+                    preferred = self.placement.rank(chunk_id, active_ids, weights)
+                    holders = self.store_chunk(chunk_id, data, preferred, replicas, codec=compression)
+                if holders:
+                    chunk_map.append({ "chunk_id": chunk_id, "nodes": holders, "index": index, "offset": index * chunk_size, "size": size })
+                else: failed.append(index)
+            except Exception as e: # Nobody reads the future: fail the upload here
+                print(f"❌ Chunk {index} failed: {e}")
+                failed.append(index)
+            finally: free_buffers.put(buf)
+
+        def store_parity(stripe):
+            try:
+                nodes = stripe_nodes(stripe)
+                for i, data in enumerate(stripes.pop(stripe).parity()):
+                    chunk_id = hashlib.sha256(data).hexdigest()
+                    holders = self.store_chunk(chunk_id, data, [nodes[ec_k + i]], 1, required=[nodes[ec_k + i]], codec=compression)
+                    if holders: parity_map.append({ "chunk_id": chunk_id, "stripe": stripe, "shard": i, "size": len(data) })
+                    else: failed.append(stripe * ec_k)
+            except Exception as e:
+                print(f"❌ Parity of stripe {stripe} failed: {e}")
+                failed.append(stripe * ec_k)
+
+        def submit(index, buf, size):
+            if mode == 'erasure' and index % ec_k == 0: stripes[index // ec_k] = code.encoder(size)
+            pending.append(ingest.submit(store, index, buf, size))
 
-        for index, chunk in enumerate(chunks):
-            node_id = active_ids[index % len(active_ids)]
-            node = self.active_nodes[node_id]
-            chunk_id = f"{file_hash}_{index}"
-            if self.send_chunk_to_node(node, chunk_id, chunk):
-                chunk_map.append({ "chunk_id": chunk_id, "node_id": node_id, "index": index })
-        
-        self.file_map[file_hash] = { 'chunks': chunk_map, 'filename': filename }
+        # Any failure (a chunk that can't be stored, a client cancelling mid-upload) gives back
+        # the references the stored chunks took, and the space they used
+        try:
+            # Hashing and replica fan-out run off the receiving thread; buffers bound how many
+            with futures.ThreadPoolExecutor(INGEST_BUFFERS, thread_name_prefix="ingest") as ingest:
+                buf, fill, index, total = None, 0, 0, 0
+                try:
+                    for piece in pieces:
+                        if failed: break
+                        view = memoryview(piece)
+                        hasher.update(view)
+                        total += len(view)
+                        while view:
+                            if buf is None:
+                                buf, fill = free_buffers.get() or bytearray(chunk_size), 0
+                            n = min(len(view), chunk_size - fill)
+                            buf[fill:fill + n] = view[:n]
+                            fill += n
+                            view = view[n:]
+                            if fill == chunk_size:
+                                submit(index, buf, fill)
+                                buf, index = None, index + 1
+                    if buf is not None and fill and not failed:
+                        submit(index, buf, fill)
+                        index += 1
+                    if mode == 'erasure' and index % ec_k and not failed:
+                        # Short final stripe: the missing data shards count as zeros
+                        last = index // ec_k
+                        if stripes[last].close(index % ec_k): pending.append(ingest.submit(store_parity, last))
+                finally:
+                    futures.wait(pending)
+            if failed: raise Exception(f"Chunk {min(failed)} could not be stored")
+            file_hash = hasher.hexdigest()
+            chunk_map.sort(key=lambda x: x['index'])
+            added = self.meta.add_document(file_hash, filename, total, chunk_map, replicas, mode, ec_k, ec_m, parity_map, chunk_size, compression)
+        except BaseException:
+            self.release_chunks(chunk_map + parity_map)
+            self.collect_garbage()
+            raise
+        if not added:
+            # Identical re-upload: the existing document already holds these chunks
+            self.release_chunks(chunk_map + parity_map)
         return file_hash
 
-    def send_chunk_to_node(self, node, chunk_id, data):
+    def placement_weights(self, node_ids):
+        # Free share of each node's PARTITION_SIZE, scaled by its recent read speed
+        usage, speeds = self.meta.node_usage(), self.latency.speeds(node_ids)
+        return {n: max(MIN_PLACEMENT_WEIGHT, (1 - usage.get(n, (0, 0))[1] / PARTITION_SIZE) * speeds[n]) for n in node_ids}
+
+    def store_chunk(self, chunk_id, data, preferred, replicas, required=(), codec="none"):
+        # Takes a reference on chunk_id and returns the nodes holding it. Only the copies the
+        # cluster is missing are written, in parallel, to the first free nodes of `preferred`
+        # (and to every `required` node), moving further down `preferred` past nodes that fail;
+        # concurrent uploads of the same chunk wait for the first write instead of repeating it.
+        # New copies are packed with `codec`, or like the existing copies if there are any.
+        # A chunk in flight is waited for first: it may be mid-write, or being deleted by the
+        # garbage sweep (its copies still listed but about to go).
+        while True:
+            with self.chunk_lock:
+                waiting = self.inflight_chunks.get(chunk_id)
+                if waiting is None:
+                    entry = self.meta.get_chunk(chunk_id)
+                    if entry and len(entry['nodes']) >= replicas and set(required) <= set(entry['nodes']):
+                        self.meta.ref_chunks([chunk_id], 1)
+                        return entry['nodes']
+                    done = self.inflight_chunks[chunk_id] = threading.Event()
+            if waiting:
+                waiting.wait()
+                continue # Re-check: that write may have failed
+            holders = entry['nodes'] if entry else []
+            targets = [n for n in required if n not in holders]
+            targets += [n for n in preferred if n not in holders and n not in targets][:replicas - len(holders) - len(targets)]
+            spare = [n for n in preferred if n not in holders and n not in targets]
+            written, ok = [], False
+            try:
+                packed = chunk_codec.pack(data, entry['codec'], sample=False) if entry else chunk_codec.pack(data, codec)
+                while targets:
+                    results = [self.transfers.submit(n, self.write_replica, n, chunk_id, packed) for n in targets]
+                    written += [n for n, f in zip(targets, results) if f.result()]
+                    # Copies that failed (node down or out of space) go to the next preferred nodes
+                    missing = max(0, replicas - len(holders) - len(written))
+                    targets, spare = spare[:missing], spare[missing:]
+                ok = bool(holders + written) and set(required) <= set(holders + written)
+                if ok and len(holders) + len(written) < replicas:
+                    print(f"⚠️ Chunk {chunk_id[:12]} stored on {len(holders) + len(written)}/{replicas} nodes")
+            finally:
+                with self.chunk_lock:
+                    try:
+                        # Record every copy that landed, but only take a reference on success
+                        if written and not entry: self.meta.add_chunk(chunk_id, written, len(packed.data), int(ok), packed.codec, packed.raw_size)
+                        elif written: self.meta.add_replicas(chunk_id, written, entry['size'])
+                        if entry and ok: self.meta.ref_chunks([chunk_id], 1)
+                    finally: # Even if the database fails, never leave waiters blocked
+                        del self.inflight_chunks[chunk_id]
+                        done.set()
+            return holders + written if ok else None
+
+    def write_replica(self, node_id, chunk_id, packed):
+        # packed: chunk_codec.Packed. A node out of space is granted more and the write retried
+        for _ in range(PARTITION_SIZE // SLAB_SIZE + 1):
+            reply = self.node_call(node_id, self.send_chunk_to_node, chunk_id, packed)
+            if not reply or reply.status != proto.STATUS_FULL or not self.grow_node(node_id, reply.arg0): break
+        return bool(reply) and reply.status == proto.STATUS_OK
+
+    def release_chunks(self, chunk_map):
+        # Unreferenced chunks stay on their nodes (and can be reused) until the next garbage sweep
+        with self.chunk_lock:
+            self.meta.ref_chunks([c['chunk_id'] for c in chunk_map], -1)
+
+    def delete_document(self, ipfs_hash):
+        if self.meta.delete_document(ipfs_hash) is None: return False
+        print(f"🗑️ Deleted document {ipfs_hash}")
+        self.collect_garbage()
+        return True
+
+    def collect_garbage(self):
+        # Deletes chunks no document references from the online nodes holding them. Copies on
+        # offline nodes stay listed for a later sweep. While a chunk is being removed it counts
+        # as in flight, so an upload of the same bytes waits and then writes it afresh.
+        with self.chunk_lock:
+            garbage = {cid: g for cid, g in self.meta.garbage_chunks().items() if cid not in self.inflight_chunks}
+            for cid in garbage: self.inflight_chunks[cid] = threading.Event()
+        try:
+            jobs = []
+            for cid, (size, nodes) in garbage.items():
+                for nid in nodes:
+                    if self.reachable(nid): jobs.append((cid, nid, size, self.transfers.submit(nid, self.node_call, nid, self.delete_from_node, cid)))
+            for cid, nid, size, future in jobs:
+                if future.result(): self.meta.drop_replica(cid, nid, size)
+            self.meta.drop_chunks(list(garbage))
+            if jobs: print(f"🗑️ Removed {sum(bool(f.result()) for *_, f in jobs)} unreferenced chunk copies")
+        finally:
+            with self.chunk_lock:
+                for cid in garbage: self.inflight_chunks.pop(cid).set()
+
+    def collect_garbage_forever(self):
+        while True:
+            time.sleep(GC_INTERVAL)
+            try: self.collect_garbage()
+            except Exception as e: print(f"⚠️ Garbage sweep failed: {e}")
+
+    # --- REPAIR ---
+    def repair_forever(self):
+        while True:
+            chunk_id, node_id = self.repairs.get()
+            try: self.repair_chunk(chunk_id, node_id)
+            except Exception as e: print(f"⚠️ Repair of chunk {chunk_id[:12]} failed: {e}")
+
+    def repair_chunk(self, chunk_id, bad_node):
+        # bad_node dropped its corrupt copy: forget it, then write a good copy (from another
+        # replica, or rebuilt from the erasure stripe) back to that node, or failing that to
+        # the next node in the chunk's placement order
+        while True:
+            with self.chunk_lock:
+                entry = self.meta.get_chunk(chunk_id)
+                if not entry or bad_node not in entry['nodes']: return
+                waiting = self.inflight_chunks.get(chunk_id)
+                if waiting is None:
+                    done = self.inflight_chunks[chunk_id] = threading.Event()
+                    self.meta.drop_replica(chunk_id, bad_node, entry['size'])
+                    break
+            waiting.wait()
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect((node['ip'], node['port']))
-            payload = json.dumps({"command": "WRITE", "chunk_id": chunk_id, "data": base64.b64encode(data).decode()}).encode()
-            s.send(struct.pack('>I', len(payload)))
-            s.send(payload)
-            s.recv(1024)
-            s.close()
-            return True
-        except: return False
+            holders = [n for n in entry['nodes'] if n != bad_node]
+            data = self.recover_chunk(chunk_id, holders)
+            if data is None:
+                print(f"❌ Chunk {chunk_id[:12]} was corrupt on node {bad_node} and no intact copy is left")
+                return
+            packed = chunk_codec.pack(data, entry['codec'], sample=False)
+            for node_id in [bad_node] + [n for n in self.placement.rank(chunk_id, self.healthy_nodes()) if n not in entry['nodes']]:
+                if self.write_replica(node_id, chunk_id, packed):
+                    self.meta.add_replicas(chunk_id, [node_id], entry['size'])
+                    print(f"🩹 Repaired chunk {chunk_id[:12]} on node {node_id}")
+                    return
+            print(f"❌ Chunk {chunk_id[:12]} could not be rewritten to any node")
+        finally:
+            with self.chunk_lock: del self.inflight_chunks[chunk_id]
+            done.set()
+
+    def recover_chunk(self, chunk_id, holders):
+        # Whole chunk from the first holder with an intact copy, else rebuilt from its stripe
+        for node_id in holders:
+            data = chunk_data(self.node_call(node_id, self.get_chunk_from_node, chunk_id))
+            if data is not None and chunk_intact(chunk_id, data): return data
+        data = self.rebuild_shard(chunk_id)
+        return data if data is not None and chunk_intact(chunk_id, data) else None
+
+    def rebuild_shard(self, chunk_id):
+        # An erasure-coded shard recomputed from the rest of its stripe (None if it isn't one)
+        for doc_hash in self.meta.chunk_documents(chunk_id):
+            doc = self.meta.get_document(doc_hash)
+            if not doc or doc['mode'] != 'erasure': continue
+            k = doc['ec_k']
+            try:
+                for chunk in doc['chunks']:
+                    if chunk['chunk_id'] == chunk_id: return self.reconstruct_segment(doc, chunk, 0, chunk['size'])
+                for stripe, shards in doc['parity'].items():
+                    for i, parity in shards.items():
+                        if parity['chunk_id'] != chunk_id: continue
+                        acc = ErasureCode(k, doc['ec_m']).encoder(parity['size'])
+                        for j, chunk in enumerate(doc['chunks'][stripe * k:(stripe + 1) * k]): acc.add(j, self.read_chunk(doc, chunk))
+                        return acc.parity()[i]
+            except IOError as e: print(f"⚠️ Shard {chunk_id[:12]} of {doc_hash[:12]} can't be rebuilt: {e}")
+        return None
+
+    def read_chunk(self, meta, chunk):
+        # A whole data chunk from any replica, rebuilt from its stripe if none answers
+        for node_id in chunk['nodes']:
+            try: return self.read_segment(node_id, chunk, 0, chunk['size'])
+            except IOError: pass
+        if meta['mode'] != 'erasure': raise IOError(f"Chunk {chunk['index']} unreadable on every replica")
+        return self.reconstruct_segment(meta, chunk, 0, chunk['size'])
+
+    def delete_from_node(self, node, chunk_id):
+        # True once the node no longer has the chunk, None if it couldn't be reached
+        try:
+            with node['pool'].connection() as s:
+                proto.send_frame(s, proto.DELETE, chunk_id)
+                reply = proto.recv_frame(s)
+        except: return None
+        return reply is not None and reply.status in (proto.STATUS_OK, proto.STATUS_NOT_FOUND)
+
+    def send_chunk_to_node(self, node, chunk_id, packed):
+        # The node's reply frame, None if it couldn't be reached
+        try:
+            with node['pool'].connection() as s:
+                proto.send_frame(s, proto.WRITE, chunk_id, chunk_codec.CODEC_IDS[packed.codec], packed.raw_size, payload=packed.data)
+                reply = proto.recv_frame(s)
+        except: return None
+        if reply and reply.status == proto.STATUS_OK: self.metrics.node_bytes.inc(len(packed.data), node=node['id'], direction="write")
+        return reply
 
     def retrieve_file(self, ipfs_hash):
-        if ipfs_hash not in self.file_map: return None, None
-        meta = self.file_map[ipfs_hash]
-        chunk_map = sorted(meta['chunks'], key=lambda x: x['index'])
-        full_data = b""
-        for chunk_meta in chunk_map:
-            node = self.active_nodes.get(chunk_meta['node_id'])
-            if node:
-                data = self.get_chunk_from_node(node, chunk_meta['chunk_id'])
-                if data: full_data += data
-        return full_data, meta['filename']
-
-    def get_chunk_from_node(self, node, chunk_id):
+        meta = self.meta.get_document(ipfs_hash)
+        if meta is None: return None, None
+        hasher, parts = hashlib.sha256(), []
+        for _, data in self.read_range(ipfs_hash):
+            hasher.update(data)
+            parts.append(data)
+        # Nodes check their chunks; this catches anything they can't (e.g. a wrong chunk served)
+        if hasher.hexdigest() != ipfs_hash: raise IOError(f"Document {ipfs_hash} failed its sha256 check")
+        return b"".join(parts), meta['filename']
+
+    def resolve_range(self, ipfs_hash, offset=0, length=0):
+        meta = self.meta.get_document(ipfs_hash)
+        if meta is None: raise KeyError(ipfs_hash)
+        # An empty document can still be read whole (offset 0); otherwise the first byte must exist
+        if offset < 0 or length < 0 or offset > meta['size'] or (meta['size'] and offset == meta['size']): raise ValueError("Range not satisfiable")
+        end = min(meta['size'], offset + length) if length else meta['size']
+        return meta, offset, end
+
+    def read_range(self, ipfs_hash, offset=0, length=0):
+        # Yields (document_offset, bytes) segments of at most STREAM_SEGMENT_SIZE in order,
+        # while up to READ_AHEAD_SEGMENTS later segments are fetched in parallel. Length 0 reads to the end.
+        meta, start, end = self.resolve_range(ipfs_hash, offset, length)
+        pending = deque()
+        try:
+            for pos, chunk, local, n in self.plan_segments(meta, start, end):
+                pending.append(self.start_read(meta, pos, chunk, local, n))
+                if len(pending) >= READ_AHEAD_SEGMENTS: yield self.finish_read(pending.popleft())
+            while pending: yield self.finish_read(pending.popleft())
+        finally:
+            for read in pending:
+                for future in read['attempts']: future.cancel()
+
+    def plan_segments(self, meta, start, end):
+        # Maps [start, end) onto (document_offset, chunk, offset_in_chunk, length) pieces
+        for chunk in sorted(meta['chunks'], key=lambda x: x['index']):
+            c_start, c_end = chunk['offset'], chunk['offset'] + chunk['size']
+            if c_end <= start: continue
+            if c_start >= end: break
+            pos, stop = max(start, c_start), min(end, c_end)
+            while pos < stop:
+                local = pos - c_start
+                n = min(STREAM_SEGMENT_SIZE - local % STREAM_SEGMENT_SIZE, stop - pos)
+                yield pos, chunk, local, n
+                pos += n
+
+    def start_read(self, meta, pos, chunk, local, n):
+        # Reads from the replica with the lowest recent latency; erasure-coded chunks with no
+        # online copy are rebuilt from their stripe in finish_read
+        key = (chunk['chunk_id'], local, n)
+        cached = self.segments.get(key)
+        if cached is not None: return {'pos': pos, 'data': cached, 'attempts': []}
+        # Suspected nodes go last, nodes whose breaker is open are skipped
+        replicas = self.latency.rank([nid for nid in chunk['nodes'] if self.reachable(nid)], chunk['index'])
+        replicas.sort(key=lambda nid: nid in self.suspects)
+        if not replicas and meta['mode'] != 'erasure': raise IOError(f"No online node holds chunk {chunk['index']}")
+        read = {'meta': meta, 'key': key, 'pos': pos, 'chunk': chunk, 'local': local, 'n': n, 'replicas': replicas, 'tried': [], 'attempts': []}
+        if replicas:
+            node_id = self.launch_read(read)
+            read['hedge_at'] = time.monotonic() + self.latency.hedge_delay(node_id)
+        return read
+
+    def launch_read(self, read):
+        # Next untried replica with a free transfer slot (a stalled node keeps its slots
+        # busy, so it is skipped); only when all are busy wait for the fastest one
+        untried = [n for n in read['replicas'] if n not in read['tried']]
+        args = (read['chunk'], read['local'], read['n'])
+        for node_id in untried:
+            future = self.transfers.submit(node_id, self.read_segment, node_id, *args, wait=False)
+            if future: break
+        else:
+            node_id = untried[0]
+            future = self.transfers.submit(node_id, self.read_segment, node_id, *args)
+        read['tried'].append(node_id)
+        read['attempts'].append(future)
+        return node_id
+
+    def finish_read(self, read):
+        # Returns (pos, data) from the segment cache or from whichever replica answers first, then caches it
+        if 'data' in read: return read['pos'], read['data']
+        pos, data = self.fetch_segment(read)
+        self.segments.put(read['key'], data)
+        return pos, data
+
+    def fetch_segment(self, read):
+        # A failed read fails over to the next replica at once; a slow one gets a single
+        # hedged request alongside it
+        hedged = False
+        while True:
+            for future in read['attempts']:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    return read['pos'], future.result()
+            running = [f for f in read['attempts'] if not f.done()]
+            spare = len(read['tried']) < len(read['replicas'])
+            if not running:
+                if not spare and read['meta']['mode'] == 'erasure':
+                    return read['pos'], self.reconstruct_segment(read['meta'], read['chunk'], read['local'], read['n'])
+                if not spare: raise IOError(f"Chunk {read['chunk']['index']} unreadable on every replica")
+                self.launch_read(read)
+                continue
+            timeout = max(0, read['hedge_at'] - time.monotonic()) if spare and not hedged else None
+            done, _ = futures.wait(running, timeout=timeout, return_when=futures.FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                self.launch_read(read)
+
+    def reconstruct_segment(self, meta, chunk, local, n):
+        # Rebuilds bytes [local, local + n) of a lost data shard from the same byte range of
+        # k other shards in its stripe, fetched in parallel
+        k, m = meta['ec_k'], meta['ec_m']
+        stripe, wanted = divmod(chunk['index'], k)
+        shards, sources = {}, []
+        for j in range(k):
+            idx = stripe * k + j
+            if idx >= len(meta['chunks']): shards[j] = b"" # Past the end of the document: zeros
+            elif j != wanted: sources.append((j, meta['chunks'][idx]))
+        for i, parity in sorted(meta['parity'].get(stripe, {}).items()): sources.append((k + i, parity))
+        sources = [(j, c) for j, c in sources if any(self.reachable(nid) for nid in c['nodes'])]
+        while len(shards) < k:
+            batch, sources = sources[:k - len(shards)], sources[k - len(shards):]
+            if len(batch) < k - len(shards): raise IOError(f"Too few shards online to rebuild chunk {chunk['index']}")
+            jobs = []
+            for j, c in batch:
+                count = max(0, min(n, c['size'] - local))
+                if not count:
+                    shards[j] = b"" # Shard is shorter than this range: zeros
+                    continue
+                node_id = next(nid for nid in c['nodes'] if self.reachable(nid))
+                source = {'chunk_id': c['chunk_id'], 'index': chunk['index']}
+                jobs.append((j, self.transfers.submit(node_id, self.read_segment, node_id, source, local, count)))
+            for j, future in jobs:
+                try: shards[j] = future.result()
+                except IOError: pass # Try the next spare shard
+        print(f"🧩 Rebuilt {n}b of chunk {chunk['index']} from stripe {stripe}")
+        return ErasureCode(k, m).decode(shards, wanted, n)
+
+    def read_segment(self, node_id, chunk, local, n):
+        if not self.reachable(node_id): raise IOError(f"Node {node_id} holding chunk {chunk['index']} is offline")
+        started = time.monotonic()
+        data = self.node_call(node_id, self.get_chunk_from_node, chunk['chunk_id'], local, n)
+        if isinstance(data, proto.Frame): # Answered, just without the chunk: no slowness to charge
+            raise IOError(f"Chunk {chunk['index']} missing or corrupt on node {node_id}")
+        if data is None or len(data) != n:
+            self.latency.record(node_id, LATENCY_FAILURE_PENALTY)
+            raise IOError(f"Chunk {chunk['index']} unreadable on node {node_id}")
+        self.latency.record(node_id, time.monotonic() - started)
+        return data
+
+    def node_counters(self, node_id):
+        # Counters a node reports about itself (chunk cache), {} if it can't be reached
+        return self.node_call(node_id, self.fetch_counters) or {}
+
+    def fetch_counters(self, node):
+        try:
+            with node['pool'].connection() as s:
+                proto.send_frame(s, proto.STATS)
+                reply = proto.recv_frame(s)
+                return json.loads(proto.recv_payload(s, reply.length)) if reply and reply.status == proto.STATUS_OK else None
+        except Exception: return None
+
+    def get_chunk_from_node(self, node, chunk_id, offset=0, length=0):
+        # The bytes; the reply frame if the node answered without them (not found, corrupt),
+        # which node_call counts as a healthy node; None if it couldn't be reached
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect((node['ip'], node['port']))
-            payload = json.dumps({"command": "READ", "chunk_id": chunk_id}).encode()
-            s.send(struct.pack('>I', len(payload)))
-            s.send(payload)
-            raw_len = s.recv(4)
-            if not raw_len: return None
-            msg_len = struct.unpack('>I', raw_len)[0]
-            data = b""
-            while len(data) < msg_len:
-                packet = s.recv(msg_len - len(data))
-                if not packet: break
-                data += packet
-            s.close()
-            return base64.b64decode(json.loads(data.decode())['data'])
+            with node['pool'].connection() as s:
+                proto.send_frame(s, proto.READ, chunk_id, offset, length)
+                reply = proto.recv_frame(s)
+                if reply is None: return None
+                if reply.status != proto.STATUS_OK: return reply
+                data = proto.recv_payload(s, reply.length)
         except: return None
+        self.metrics.node_bytes.inc(len(data), node=node['id'], direction="read")
+        return data
 
     # --- AUTH ---
     def initiate_registration(self, u, e, p): 
@@ -230,19 +869,24 @@ class CivicCloudManager:
     def verify_login(self, u, p):
         import bcrypt
         return u in self.credentials and bcrypt.checkpw(p.encode(), self.credentials[u])
+    def spawn_node(self, node_id, stdout=None):
+        # Own console window on Windows; plain child process elsewhere
+        flags = getattr(subprocess, 'CREATE_NEW_CONSOLE', 0)
+        self.node_processes[str(node_id)] = subprocess.Popen([sys.executable, NODE_SCRIPT, str(node_id)], creationflags=flags, stdout=stdout)
     def start_nodes(self):
-        subprocess.call("taskkill /F /IM python.exe /FI \"WINDOWTITLE eq CivicNode*\"", shell=True)
-        time.sleep(1)
+        if os.name == 'nt':
+            subprocess.call("taskkill /F /IM python.exe /FI \"WINDOWTITLE eq CivicNode*\"", shell=True)
+            time.sleep(1)
         for i in range(1, NODE_COUNT + 1):
-            cmd = f"python storage_virtual_node.py {i}"
-            self.node_processes[str(i)] = subprocess.Popen(cmd, shell=True, creationflags=subprocess.CREATE_NEW_CONSOLE)
+            self.spawn_node(i)
 
 # === SERVICER ===
 class CivicCloudServicer(cloud_pb2_grpc.CivicCloudServiceServicer):
     def __init__(self, manager): self.manager = manager
     def GetAdminStats(self, r, c):
         n, u = self.manager.get_admin_stats()
-        return cloud_pb2.AdminStatsResponse(total_users=len(self.manager.credentials), total_files=len(self.manager.file_map), total_network_storage=TOTAL_DISK_SIZE, used_network_storage=u, nodes=[cloud_pb2.NodeDetail(**x) for x in n])
+        return cloud_pb2.AdminStatsResponse(total_users=len(self.manager.credentials), total_files=self.manager.meta.count_documents(), total_network_storage=sum(x['total_space'] for x in n), used_network_storage=u, logical_network_storage=sum(x['logical_space'] for x in n), nodes=[cloud_pb2.NodeDetail(**x) for x in n],
+                                            segment_cache=cache_stats(self.manager.segments.stats()), rebalance=cloud_pb2.RebalanceStatus(**self.manager.rebalancer.status()))
     def ToggleNode(self, r, c): return cloud_pb2.Response(result=self.manager.toggle_node(r.node_id, r.action))
     def AddNode(self, r, c): return cloud_pb2.Response(result=self.manager.add_node())
     def RemoveNode(self, r, c): return cloud_pb2.Response(result=self.manager.remove_node(r.node_id))
@@ -263,33 +907,65 @@ class CivicCloudServicer(cloud_pb2_grpc.CivicCloudServiceServicer):
     # ✅ STREAMING HANDLER
     def StoreProjectDocument(self, request_iterator, context):
         try:
-            full_data = bytearray()
-            metadata = {}
+            requests = iter(request_iterator)
+            first = next(requests, None)
+            if first is None: return cloud_pb2.StoreProjectDocumentResponse(result="Failed")
             print("📥 Stream started...")
-            for req in request_iterator:
-                if not metadata:
-                    metadata = {'filename': req.filename, 'proposer': req.proposer_wallet}
-                full_data.extend(req.data)
-            
-            print(f"✅ Stream Finished. Size: {len(full_data)} bytes. Distributing...")
-            h = self.manager.distribute_file(bytes(full_data), metadata['filename'])
-            return cloud_pb2.StoreProjectDocumentResponse(ipfs_hash=h, result="Success")
+            pieces = (req.data for req in itertools.chain([first], requests))
+            h = self.manager.distribute_stream(pieces, first.filename, first.replication_factor, first.storage_mode, first.data_shards, first.parity_shards, first.file_size, first.chunk_size, first.compression)
+            meta = self.manager.meta.get_document(h)
+            print(f"✅ Stream Finished. Size: {meta['size']} bytes in {len(meta['chunks'])} chunks.")
+            return cloud_pb2.StoreProjectDocumentResponse(ipfs_hash=h, result="Success", size=meta['size'], node_count=len({n for c in meta['chunks'] for n in c['nodes']}))
         except Exception as e:
             print(f"❌ Stream Error: {e}")
+            self.manager.metrics.rpc_errors.inc(method="StoreProjectDocument", code="FAILED")
             return cloud_pb2.StoreProjectDocumentResponse(result="Failed")
 
     def GetProjectDocument(self, r, c):
-        d, f = self.manager.retrieve_file(r.ipfs_hash)
-        return cloud_pb2.GetProjectDocumentResponse(data=d, filename=f) if d else cloud_pb2.GetProjectDocumentResponse()
+        try: d, f = self.manager.retrieve_file(r.ipfs_hash)
+        except Exception as e:
+            print(f"❌ Retrieve Error: {e}")
+            self.manager.metrics.rpc_errors.inc(method="GetProjectDocument", code="FAILED")
+            d = None
+        return cloud_pb2.GetProjectDocumentResponse(data=d, filename=f, size=len(d)) if d else cloud_pb2.GetProjectDocumentResponse()
 
-if __name__ == '__main__':
-    manager = CivicCloudManager()
-    manager.start_nodes()
+    def DeleteDocument(self, r, c):
+        try: return cloud_pb2.Response(result="Deleted" if self.manager.delete_document(r.ipfs_hash) else "Not Found")
+        except Exception as e:
+            print(f"❌ Delete Error: {e}")
+            self.manager.metrics.rpc_errors.inc(method="DeleteDocument", code="FAILED")
+            return cloud_pb2.Response(result="Failed")
+
+    # ✅ SERVER-STREAMING, BYTE-RANGE RETRIEVAL
+    def StreamProjectDocument(self, r, c):
+        try: meta, start, end = self.manager.resolve_range(r.ipfs_hash, r.offset, r.length)
+        except KeyError: c.abort(grpc.StatusCode.NOT_FOUND, "Document not found")
+        except ValueError as e: c.abort(grpc.StatusCode.OUT_OF_RANGE, str(e))
+        sent = False
+        try:
+            for offset, data in self.manager.read_range(r.ipfs_hash, start, end - start):
+                yield cloud_pb2.DocumentSegment(data=bytes(data), filename=meta['filename'], size=meta['size'], offset=offset)
+                sent = True
+        except IOError as e:
+            print(f"❌ Stream Read Error: {e}")
+            c.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+        if not sent: yield cloud_pb2.DocumentSegment(filename=meta['filename'], size=meta['size'], offset=start)
+
+def serve(manager, port=GRPC_PORT, metrics_port=METRICS_PORT):
     # ✅ LIMIT SET TO 2GB FOR WINDOWS (Streaming bypasses this for file content)
     MAX = 2147483647 
-    server = grpc.server(futures.ThreadPoolExecutor(10), options=[('grpc.max_receive_message_length', MAX), ('grpc.max_send_message_length', MAX)])
+    server = grpc.server(futures.ThreadPoolExecutor(GRPC_WORKERS), interceptors=[metrics.RpcMetrics(manager.metrics, GRPC_WORKERS)],
+                         options=[('grpc.max_receive_message_length', MAX), ('grpc.max_send_message_length', MAX)])
     cloud_pb2_grpc.add_CivicCloudServiceServicer_to_server(CivicCloudServicer(manager), server)
-    server.add_insecure_port(f'0.0.0.0:{GRPC_PORT}')
-    print(f"☁️  CivicChain Cloud LIVE on {GRPC_PORT} (Streaming Mode)")
+    server.add_insecure_port(f'0.0.0.0:{port}')
+    print(f"☁️  CivicChain Cloud LIVE on {port} (Streaming Mode)")
     server.start()
-    server.wait_for_termination()
\ No newline at end of file
+    if metrics_port:
+        metrics.serve_metrics(manager.metrics, metrics_port)
+        print(f"📊 Metrics on http://0.0.0.0:{metrics_port}/metrics")
+    return server
+
+if __name__ == '__main__':
+    manager = CivicCloudManager()
+    manager.start_nodes()
+    serve(manager).wait_for_termination()
\ No newline at end of file
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x63loud.proto\x12\x05\x63loud\"/\n\x0cLoginRequest\x12\r\n\x05login\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"\x1a\n\x08Response\x12\x0e\n\x06result\x18\x01 \x01(\t\".\n\x10VerifyOTPRequest\x12\r\n\x05login\x18\x01 \x01(\t\x12\x0b\n\x03otp\x18\x02 \x01(\t\"/\n\rTokenResponse\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"H\n\x13RegisterInitRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"3\n\x15RegisterVerifyRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x0b\n\x03otp\x18\x02 \x01(\t\" \n\x0fGetNodesRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\x85\x01\n\x08NodeInfo\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0b\n\x03vip\x18\x03 \x01(\t\x12\n\n\x02ip\x18\x04 \x01(\t\x12\x0c\n\x04port\x18\x05 \x01(\x05\x12\x0f\n\x07used_mb\x18\x06 \x01(\x01\x12\x10\n\x08total_mb\x18\x07 \x01(\x05\x12\x0e\n\x06uptime\x18\x08 \x01(\x03\"\xaa\x01\n\rNodesResponse\x12.\n\x05nodes\x18\x01 \x03(\x0b\x32\x1f.cloud.NodesResponse.NodesEntry\x12\x13\n\x0btotal_nodes\x18\x02 \x01(\x05\x12\x15\n\rtotal_storage\x18\x03 \x01(\x03\x1a=\n\nNodesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1e\n\x05value\x18\x02 \x01(\x0b\x32\x0f.cloud.NodeInfo:\x02\x38\x01\"y\n\x1bStoreProjectDocumentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nproject_id\x18\x02 \x01(\t\x12\x10\n\x08\x66ilename\x18\x03 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\x12\x17\n\x0fproposer_wallet\x18\x05 \x01(\t\"c\n\x1cStoreProjectDocumentResponse\x12\x11\n\tipfs_hash\x18\x01 \x01(\t\x12\x0e\n\x06result\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x12\n\nnode_count\x18\x04 \x01(\x05\"=\n\x19GetProjectDocumentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tipfs_hash\x18\x02 \x01(\t\"b\n\x1aGetProjectDocumentResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x16\n\x0enode_retrieved\x18\x04 \x01(\t\"#\n\x12HealthCheckRequest\x12\r\n\x05token\x18\x01 \x01(\t\"q\n\x13HealthCheckResponse\x12\x0f\n\x07healthy\x18\x01 \x01(\x08\x12\x14\n\x0c\x61\x63tive_nodes\x18\x02 \x01(\x05\x12\x15\n\rtotal_storage\x18\x03 \x01(\x03\x12\x1c\n\x14storage_used_percent\x18\x04 \x01(\x01\"(\n\x11\x41\x64minStatsRequest\x12\x13\n\x0b\x61\x64min_token\x18\x01 \x01(\t\"\x92\x01\n\nNodeDetail\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\n\n\x02ip\x18\x03 \x01(\t\x12\x0c\n\x04port\x18\x04 \x01(\x05\x12\x13\n\x0btotal_space\x18\x05 \x01(\x03\x12\x12\n\nused_space\x18\x06 \x01(\x03\x12\x13\n\x0b\x63hunk_count\x18\x07 \x01(\x05\x12\x0b\n\x03pid\x18\x08 \x01(\x05\"\x9d\x01\n\x12\x41\x64minStatsResponse\x12\x13\n\x0btotal_users\x18\x01 \x01(\x05\x12\x13\n\x0btotal_files\x18\x02 \x01(\x05\x12\x1d\n\x15total_network_storage\x18\x03 \x01(\x03\x12\x1c\n\x14used_network_storage\x18\x04 \x01(\x03\x12 \n\x05nodes\x18\x05 \x03(\x0b\x32\x11.cloud.NodeDetail\"4\n\x11ToggleNodeRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\"%\n\x0e\x41\x64\x64NodeRequest\x12\x13\n\x0b\x61\x64min_token\x18\x01 \x01(\t\"$\n\x11RemoveNodeRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\"\"\n\x0fNodeFileRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\"X\n\x0f\x46ileChunkDetail\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x10\n\x08\x63hunk_id\x18\x02 \x01(\t\x12\x13\n\x0b\x63hunk_index\x18\x03 \x01(\x05\x12\x0c\n\x04size\x18\x04 \x01(\x03\"L\n\x11NodeFilesResponse\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12&\n\x06\x63hunks\x18\x02 \x03(\x0b\x32\x16.cloud.FileChunkDetail2\xe7\x06\n\x11\x43ivicCloudService\x12-\n\x05Login\x12\x13.cloud.LoginRequest\x1a\x0f.cloud.Response\x12:\n\tVerifyOTP\x12\x17.cloud.VerifyOTPRequest\x1a\x14.cloud.TokenResponse\x12;\n\x0cRegisterInit\x12\x1a.cloud.RegisterInitRequest\x1a\x0f.cloud.Response\x12?\n\x0eRegisterVerify\x12\x1c.cloud.RegisterVerifyRequest\x1a\x0f.cloud.Response\x12\x38\n\x08GetNodes\x12\x16.cloud.GetNodesRequest\x1a\x14.cloud.NodesResponse\x12\x61\n\x14StoreProjectDocument\x12\".cloud.StoreProjectDocumentRequest\x1a#.cloud.StoreProjectDocumentResponse(\x01\x12Y\n\x12GetProjectDocument\x12 .cloud.GetProjectDocumentRequest\x1a!.cloud.GetProjectDocumentResponse\x12\x44\n\x0bHealthCheck\x12\x19.cloud.HealthCheckRequest\x1a\x1a.cloud.HealthCheckResponse\x12\x44\n\rGetAdminStats\x12\x18.cloud.AdminStatsRequest\x1a\x19.cloud.AdminStatsResponse\x12\x37\n\nToggleNode\x12\x18.cloud.ToggleNodeRequest\x1a\x0f.cloud.Response\x12\x31\n\x07\x41\x64\x64Node\x12\x15.cloud.AddNodeRequest\x1a\x0f.cloud.Response\x12\x37\n\nRemoveNode\x12\x18.cloud.RemoveNodeRequest\x1a\x0f.cloud.Response\x12@\n\x0cGetNodeFiles\x12\x16.cloud.NodeFileRequest\x1a\x18.cloud.NodeFilesResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x63loud.proto\x12\x05\x63loud\"/\n\x0cLoginRequest\x12\r\n\x05login\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"\x1a\n\x08Response\x12\x0e\n\x06result\x18\x01 \x01(\t\".\n\x10VerifyOTPRequest\x12\r\n\x05login\x18\x01 \x01(\t\x12\x0b\n\x03otp\x18\x02 \x01(\t\"/\n\rTokenResponse\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"H\n\x13RegisterInitRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"3\n\x15RegisterVerifyRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x0b\n\x03otp\x18\x02 \x01(\t\" \n\x0fGetNodesRequest\x12\r\n\x05token\x18\x01 \x01(\t\"\x85\x01\n\x08NodeInfo\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0b\n\x03vip\x18\x03 \x01(\t\x12\n\n\x02ip\x18\x04 \x01(\t\x12\x0c\n\x04port\x18\x05 \x01(\x05\x12\x0f\n\x07used_mb\x18\x06 \x01(\x01\x12\x10\n\x08total_mb\x18\x07 \x01(\x05\x12\x0e\n\x06uptime\x18\x08 \x01(\x03\"\xaa\x01\n\rNodesResponse\x12.\n\x05nodes\x18\x01 \x03(\x0b\x32\x1f.cloud.NodesResponse.NodesEntry\x12\x13\n\x0btotal_nodes\x18\x02 \x01(\x05\x12\x15\n\rtotal_storage\x18\x03 \x01(\x03\x1a=\n\nNodesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1e\n\x05value\x18\x02 \x01(\x0b\x32\x0f.cloud.NodeInfo:\x02\x38\x01\"\x93\x02\n\x1bStoreProjectDocumentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nproject_id\x18\x02 \x01(\t\x12\x10\n\x08\x66ilename\x18\x03 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\x12\x17\n\x0fproposer_wallet\x18\x05 \x01(\t\x12\x1a\n\x12replication_factor\x18\x06 \x01(\x05\x12\x14\n\x0cstorage_mode\x18\x07 \x01(\t\x12\x13\n\x0b\x64\x61ta_shards\x18\x08 \x01(\x05\x12\x15\n\rparity_shards\x18\t \x01(\x05\x12\x11\n\tfile_size\x18\n \x01(\x03\x12\x13\n\x0b\x63ompression\x18\x0b \x01(\t\x12\x12\n\nchunk_size\x18\x0c \x01(\x03\"c\n\x1cStoreProjectDocumentResponse\x12\x11\n\tipfs_hash\x18\x01 \x01(\t\x12\x0e\n\x06result\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x12\n\nnode_count\x18\x04 \x01(\x05\"=\n\x19GetProjectDocumentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tipfs_hash\x18\x02 \x01(\t\"9\n\x15\x44\x65leteDocumentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tipfs_hash\x18\x02 \x01(\t\"b\n\x1aGetProjectDocumentResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x16\n\x0enode_retrieved\x18\x04 \x01(\t\"`\n\x1cStreamProjectDocumentRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tipfs_hash\x18\x02 \x01(\t\x12\x0e\n\x06offset\x18\x03 \x01(\x03\x12\x0e\n\x06length\x18\x04 \x01(\x03\"O\n\x0f\x44ocumentSegment\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x0e\n\x06offset\x18\x04 \x01(\x03\"#\n\x12HealthCheckRequest\x12\r\n\x05token\x18\x01 \x01(\t\"q\n\x13HealthCheckResponse\x12\x0f\n\x07healthy\x18\x01 \x01(\x08\x12\x14\n\x0c\x61\x63tive_nodes\x18\x02 \x01(\x05\x12\x15\n\rtotal_storage\x18\x03 \x01(\x03\x12\x1c\n\x14storage_used_percent\x18\x04 \x01(\x01\"(\n\x11\x41\x64minStatsRequest\x12\x13\n\x0b\x61\x64min_token\x18\x01 \x01(\t\"^\n\nCacheStats\x12\x0c\n\x04hits\x18\x01 \x01(\x03\x12\x0e\n\x06misses\x18\x02 \x01(\x03\x12\x11\n\tevictions\x18\x03 \x01(\x03\x12\r\n\x05\x62ytes\x18\x04 \x01(\x03\x12\x10\n\x08\x63\x61pacity\x18\x05 \x01(\x03\"\xf1\x01\n\nNodeDetail\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\n\n\x02ip\x18\x03 \x01(\t\x12\x0c\n\x04port\x18\x04 \x01(\x05\x12\x13\n\x0btotal_space\x18\x05 \x01(\x03\x12\x12\n\nused_space\x18\x06 \x01(\x03\x12\x13\n\x0b\x63hunk_count\x18\x07 \x01(\x05\x12\x0b\n\x03pid\x18\x08 \x01(\x05\x12 \n\x05\x63\x61\x63he\x18\t \x01(\x0b\x32\x11.cloud.CacheStats\x12\x14\n\x0cinflight_ops\x18\n \x01(\x05\x12\x0e\n\x06health\x18\x0b \x01(\t\x12\x15\n\rlogical_space\x18\x0c \x01(\x03\"}\n\x0fRebalanceStatus\x12\x0f\n\x07running\x18\x01 \x01(\x08\x12\x14\n\x0c\x63hunks_moved\x18\x02 \x01(\x03\x12\x13\n\x0b\x62ytes_moved\x18\x03 \x01(\x03\x12\x15\n\rbytes_planned\x18\x04 \x01(\x03\x12\x17\n\x0f\x62ytes_remaining\x18\x05 \x01(\x03\"\x93\x02\n\x12\x41\x64minStatsResponse\x12\x13\n\x0btotal_users\x18\x01 \x01(\x05\x12\x13\n\x0btotal_files\x18\x02 \x01(\x05\x12\x1d\n\x15total_network_storage\x18\x03 \x01(\x03\x12\x1c\n\x14used_network_storage\x18\x04 \x01(\x03\x12 \n\x05nodes\x18\x05 \x03(\x0b\x32\x11.cloud.NodeDetail\x12(\n\rsegment_cache\x18\x06 \x01(\x0b\x32\x11.cloud.CacheStats\x12)\n\trebalance\x18\x07 \x01(\x0b\x32\x16.cloud.RebalanceStatus\x12\x1f\n\x17logical_network_storage\x18\x08 \x01(\x03\"4\n\x11ToggleNodeRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\"%\n\x0e\x41\x64\x64NodeRequest\x12\x13\n\x0b\x61\x64min_token\x18\x01 \x01(\t\"$\n\x11RemoveNodeRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\"\"\n\x0fNodeFileRequest\x12\x0f\n\x07node_id\x18\x01 \x01(\t\"X\n\x0f\x46ileChunkDetail\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x10\n\x08\x63hunk_id\x18\x02 \x01(\t\x12\x13\n\x0b\x63hunk_index\x18\x03 \x01(\x05\x12\x0c\n\x04size\x18\x04 \x01(\x03\"L\n\x11NodeFilesResponse\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12&\n\x06\x63hunks\x18\x02 \x03(\x0b\x32\x16.cloud.FileChunkDetail2\x80\x08\n\x11\x43ivicCloudService\x12-\n\x05Login\x12\x13.cloud.LoginRequest\x1a\x0f.cloud.Response\x12:\n\tVerifyOTP\x12\x17.cloud.VerifyOTPRequest\x1a\x14.cloud.TokenResponse\x12;\n\x0cRegisterInit\x12\x1a.cloud.RegisterInitRequest\x1a\x0f.cloud.Response\x12?\n\x0eRegisterVerify\x12\x1c.cloud.RegisterVerifyRequest\x1a\x0f.cloud.Response\x12\x38\n\x08GetNodes\x12\x16.cloud.GetNodesRequest\x1a\x14.cloud.NodesResponse\x12\x61\n\x14StoreProjectDocument\x12\".cloud.StoreProjectDocumentRequest\x1a#.cloud.StoreProjectDocumentResponse(\x01\x12Y\n\x12GetProjectDocument\x12 .cloud.GetProjectDocumentRequest\x1a!.cloud.GetProjectDocumentResponse\x12V\n\x15StreamProjectDocument\x12#.cloud.StreamProjectDocumentRequest\x1a\x16.cloud.DocumentSegment0\x01\x12?\n\x0e\x44\x65leteDocument\x12\x1c.cloud.DeleteDocumentRequest\x1a\x0f.cloud.Response\x12\x44\n\x0bHealthCheck\x12\x19.cloud.HealthCheckRequest\x1a\x1a.cloud.HealthCheckResponse\x12\x44\n\rGetAdminStats\x12\x18.cloud.AdminStatsRequest\x1a\x19.cloud.AdminStatsResponse\x12\x37\n\nToggleNode\x12\x18.cloud.ToggleNodeRequest\x1a\x0f.cloud.Response\x12\x31\n\x07\x41\x64\x64Node\x12\x15.cloud.AddNodeRequest\x1a\x0f.cloud.Response\x12\x37\n\nRemoveNode\x12\x18.cloud.RemoveNodeRequest\x1a\x0f.cloud.Response\x12@\n\x0cGetNodeFiles\x12\x16.cloud.NodeFileRequest\x1a\x18.cloud.NodeFilesResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -53,36 +53,46 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_NODESRESPONSE']._serialized_end=664
   _globals['_NODESRESPONSE_NODESENTRY']._serialized_start=603
   _globals['_NODESRESPONSE_NODESENTRY']._serialized_end=664
-  _globals['_STOREPROJECTDOCUMENTREQUEST']._serialized_start=666
-  _globals['_STOREPROJECTDOCUMENTREQUEST']._serialized_end=787
-  _globals['_STOREPROJECTDOCUMENTRESPONSE']._serialized_start=789
-  _globals['_STOREPROJECTDOCUMENTRESPONSE']._serialized_end=888
-  _globals['_GETPROJECTDOCUMENTREQUEST']._serialized_start=890
-  _globals['_GETPROJECTDOCUMENTREQUEST']._serialized_end=951
-  _globals['_GETPROJECTDOCUMENTRESPONSE']._serialized_start=953
-  _globals['_GETPROJECTDOCUMENTRESPONSE']._serialized_end=1051
-  _globals['_HEALTHCHECKREQUEST']._serialized_start=1053
-  _globals['_HEALTHCHECKREQUEST']._serialized_end=1088
-  _globals['_HEALTHCHECKRESPONSE']._serialized_start=1090
-  _globals['_HEALTHCHECKRESPONSE']._serialized_end=1203
-  _globals['_ADMINSTATSREQUEST']._serialized_start=1205
-  _globals['_ADMINSTATSREQUEST']._serialized_end=1245
-  _globals['_NODEDETAIL']._serialized_start=1248
-  _globals['_NODEDETAIL']._serialized_end=1394
-  _globals['_ADMINSTATSRESPONSE']._serialized_start=1397
-  _globals['_ADMINSTATSRESPONSE']._serialized_end=1554
-  _globals['_TOGGLENODEREQUEST']._serialized_start=1556
-  _globals['_TOGGLENODEREQUEST']._serialized_end=1608
-  _globals['_ADDNODEREQUEST']._serialized_start=1610
-  _globals['_ADDNODEREQUEST']._serialized_end=1647
-  _globals['_REMOVENODEREQUEST']._serialized_start=1649
-  _globals['_REMOVENODEREQUEST']._serialized_end=1685
-  _globals['_NODEFILEREQUEST']._serialized_start=1687
-  _globals['_NODEFILEREQUEST']._serialized_end=1721
-  _globals['_FILECHUNKDETAIL']._serialized_start=1723
-  _globals['_FILECHUNKDETAIL']._serialized_end=1811
-  _globals['_NODEFILESRESPONSE']._serialized_start=1813
-  _globals['_NODEFILESRESPONSE']._serialized_end=1889
-  _globals['_CIVICCLOUDSERVICE']._serialized_start=1892
-  _globals['_CIVICCLOUDSERVICE']._serialized_end=2763
+  _globals['_STOREPROJECTDOCUMENTREQUEST']._serialized_start=667
+  _globals['_STOREPROJECTDOCUMENTREQUEST']._serialized_end=942
+  _globals['_STOREPROJECTDOCUMENTRESPONSE']._serialized_start=944
+  _globals['_STOREPROJECTDOCUMENTRESPONSE']._serialized_end=1043
+  _globals['_GETPROJECTDOCUMENTREQUEST']._serialized_start=1045
+  _globals['_GETPROJECTDOCUMENTREQUEST']._serialized_end=1106
+  _globals['_DELETEDOCUMENTREQUEST']._serialized_start=1108
+  _globals['_DELETEDOCUMENTREQUEST']._serialized_end=1165
+  _globals['_GETPROJECTDOCUMENTRESPONSE']._serialized_start=1167
+  _globals['_GETPROJECTDOCUMENTRESPONSE']._serialized_end=1265
+  _globals['_STREAMPROJECTDOCUMENTREQUEST']._serialized_start=1267
+  _globals['_STREAMPROJECTDOCUMENTREQUEST']._serialized_end=1363
+  _globals['_DOCUMENTSEGMENT']._serialized_start=1365
+  _globals['_DOCUMENTSEGMENT']._serialized_end=1444
+  _globals['_HEALTHCHECKREQUEST']._serialized_start=1446
+  _globals['_HEALTHCHECKREQUEST']._serialized_end=1481
+  _globals['_HEALTHCHECKRESPONSE']._serialized_start=1483
+  _globals['_HEALTHCHECKRESPONSE']._serialized_end=1596
+  _globals['_ADMINSTATSREQUEST']._serialized_start=1598
+  _globals['_ADMINSTATSREQUEST']._serialized_end=1638
+  _globals['_CACHESTATS']._serialized_start=1640
+  _globals['_CACHESTATS']._serialized_end=1734
+  _globals['_NODEDETAIL']._serialized_start=1737
+  _globals['_NODEDETAIL']._serialized_end=1978
+  _globals['_REBALANCESTATUS']._serialized_start=1980
+  _globals['_REBALANCESTATUS']._serialized_end=2105
+  _globals['_ADMINSTATSRESPONSE']._serialized_start=2108
+  _globals['_ADMINSTATSRESPONSE']._serialized_end=2383
+  _globals['_TOGGLENODEREQUEST']._serialized_start=2385
+  _globals['_TOGGLENODEREQUEST']._serialized_end=2437
+  _globals['_ADDNODEREQUEST']._serialized_start=2439
+  _globals['_ADDNODEREQUEST']._serialized_end=2476
+  _globals['_REMOVENODEREQUEST']._serialized_start=2478
+  _globals['_REMOVENODEREQUEST']._serialized_end=2514
+  _globals['_NODEFILEREQUEST']._serialized_start=2516
+  _globals['_NODEFILEREQUEST']._serialized_end=2550
+  _globals['_FILECHUNKDETAIL']._serialized_start=2552
+  _globals['_FILECHUNKDETAIL']._serialized_end=2640
+  _globals['_NODEFILESRESPONSE']._serialized_start=2642
+  _globals['_NODEFILESRESPONSE']._serialized_end=2718
+  _globals['_CIVICCLOUDSERVICE']._serialized_start=2721
+  _globals['_CIVICCLOUDSERVICE']._serialized_end=3745
 # @@protoc_insertion_point(module_scope)
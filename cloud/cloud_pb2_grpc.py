@@ -70,6 +70,16 @@ class CivicCloudServiceStub(object):
                 request_serializer=cloud__pb2.GetProjectDocumentRequest.SerializeToString,
                 response_deserializer=cloud__pb2.GetProjectDocumentResponse.FromString,
                 _registered_method=True)
+        self.StreamProjectDocument = channel.unary_stream(
+                '/cloud.CivicCloudService/StreamProjectDocument',
+                request_serializer=cloud__pb2.StreamProjectDocumentRequest.SerializeToString,
+                response_deserializer=cloud__pb2.DocumentSegment.FromString,
+                _registered_method=True)
+        self.DeleteDocument = channel.unary_unary(
+                '/cloud.CivicCloudService/DeleteDocument',
+                request_serializer=cloud__pb2.DeleteDocumentRequest.SerializeToString,
+                response_deserializer=cloud__pb2.Response.FromString,
+                _registered_method=True)
         self.HealthCheck = channel.unary_unary(
                 '/cloud.CivicCloudService/HealthCheck',
                 request_serializer=cloud__pb2.HealthCheckRequest.SerializeToString,
@@ -149,6 +159,20 @@ class CivicCloudServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamProjectDocument(self, request, context):
+        """✅ Bounded-size segments, so large media never travels as one message
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DeleteDocument(self, request, context):
+        """Drops the document; chunks no other document shares are freed on the nodes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def HealthCheck(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -223,6 +247,16 @@ def add_CivicCloudServiceServicer_to_server(servicer, server):
                     request_deserializer=cloud__pb2.GetProjectDocumentRequest.FromString,
                     response_serializer=cloud__pb2.GetProjectDocumentResponse.SerializeToString,
             ),
+            'StreamProjectDocument': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamProjectDocument,
+                    request_deserializer=cloud__pb2.StreamProjectDocumentRequest.FromString,
+                    response_serializer=cloud__pb2.DocumentSegment.SerializeToString,
+            ),
+            'DeleteDocument': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeleteDocument,
+                    request_deserializer=cloud__pb2.DeleteDocumentRequest.FromString,
+                    response_serializer=cloud__pb2.Response.SerializeToString,
+            ),
             'HealthCheck': grpc.unary_unary_rpc_method_handler(
                     servicer.HealthCheck,
                     request_deserializer=cloud__pb2.HealthCheckRequest.FromString,
@@ -454,6 +488,60 @@ class CivicCloudService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamProjectDocument(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/cloud.CivicCloudService/StreamProjectDocument',
+            cloud__pb2.StreamProjectDocumentRequest.SerializeToString,
+            cloud__pb2.DocumentSegment.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DeleteDocument(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/cloud.CivicCloudService/DeleteDocument',
+            cloud__pb2.DeleteDocumentRequest.SerializeToString,
+            cloud__pb2.Response.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def HealthCheck(request,
             target,
@@ -0,0 +1,113 @@
+import threading
+
+# === ERASURE CODING (systematic Reed-Solomon over GF(256)) ===
+# A stripe is k data shards + m parity shards; any k of them rebuild the rest.
+# Parity row 0 is all ones, so with m = 1 this is plain RAID-5 XOR parity.
+# Byte-wise GF multiplication runs through bytes.translate tables and shard
+# addition through big-int XOR, so both work on whole shards at C speed.
+
+GF_POLY = 0x11d
+EXP = [0] * 512
+LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    EXP[_i] = _x
+    LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100: _x ^= GF_POLY
+for _i in range(255, 512): EXP[_i] = EXP[_i - 255]
+
+def gf_mul(a, b):
+    if a == 0 or b == 0: return 0
+    return EXP[LOG[a] + LOG[b]]
+
+def gf_inv(a):
+    if a == 0: raise ZeroDivisionError("0 has no inverse in GF(256)")
+    return EXP[255 - LOG[a]]
+
+# MUL_TABLES[c] maps every byte x to c*x, for bytes.translate
+MUL_TABLES = [bytes(gf_mul(c, x) for x in range(256)) for c in range(256)]
+
+def scaled(c, data):
+    # c * data as a little-endian int, ready to XOR into an accumulator
+    if c == 1: return int.from_bytes(data, 'little')
+    return int.from_bytes(bytes(data).translate(MUL_TABLES[c]), 'little')
+
+def invert(matrix):
+    # Gauss-Jordan inversion of a square matrix over GF(256)
+    n = len(matrix)
+    rows = [list(row) + [int(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if rows[r][col]), None)
+        if pivot is None: raise ValueError("Shard set is not decodable")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        inv = gf_inv(rows[col][col])
+        rows[col] = [gf_mul(inv, v) for v in rows[col]]
+        for r in range(n):
+            if r != col and rows[r][col]:
+                f = rows[r][col]
+                rows[r] = [v ^ gf_mul(f, p) for v, p in zip(rows[r], rows[col])]
+    return [row[n:] for row in rows]
+
+class ErasureCode:
+    def __init__(self, k, m):
+        if k < 1 or m < 1 or k + m > 256: raise ValueError("Need k >= 1, m >= 1 and k + m <= 256")
+        self.k, self.m = k, m
+        # Cauchy matrix with every column scaled so parity row 0 is all ones;
+        # scaling keeps every square submatrix invertible, so any k shards decode
+        cauchy = [[gf_inv((k + i) ^ j) for j in range(k)] for i in range(m)]
+        self.parity_rows = [[gf_mul(cauchy[i][j], gf_inv(cauchy[0][j])) for j in range(k)] for i in range(m)]
+
+    def row(self, shard):
+        # Generator row of shard 0..k+m-1 (identity for data shards)
+        if shard < self.k: return [int(j == shard) for j in range(self.k)]
+        return self.parity_rows[shard - self.k]
+
+    def encoder(self, shard_size):
+        return ParityAccumulator(self, shard_size)
+
+    def decode(self, shards, wanted, size):
+        # shards: {shard index: bytes} for exactly k shards (shorter ones are zero padded);
+        # returns `size` bytes of data shard `wanted`
+        if wanted in shards: return bytes(shards[wanted])[:size].ljust(size, b"\0")
+        order = sorted(shards)
+        if len(order) != self.k: raise ValueError(f"Need exactly {self.k} shards to decode")
+        coeffs = invert([self.row(s) for s in order])[wanted]
+        acc = 0
+        for c, s in zip(coeffs, order):
+            if c: acc ^= scaled(c, shards[s])
+        return acc.to_bytes(max(size, (acc.bit_length() + 7) // 8), 'little')[:size]
+
+class ParityAccumulator:
+    # Folds data shards into the m parity shards as they arrive, in any order. Missing
+    # data shards of a short final stripe count as zeros.
+    def __init__(self, code, shard_size):
+        self.code = code
+        self.shard_size = shard_size
+        self.acc = [0] * code.m
+        self.added = 0
+        self.expected = code.k
+        self.done = False
+        self.lock = threading.Lock()
+
+    def add(self, shard, data):
+        # True exactly once, when the last expected shard has been added
+        terms = [scaled(row[shard], data) if row[shard] else 0 for row in self.code.parity_rows]
+        with self.lock:
+            for i, t in enumerate(terms): self.acc[i] ^= t
+            self.added += 1
+            return self.complete()
+
+    def close(self, count):
+        # The stripe ended after `count` data shards; True if that completes it now
+        with self.lock:
+            self.expected = count
+            return self.complete()
+
+    def complete(self):
+        if self.done or self.added < self.expected: return False
+        self.done = True
+        return True
+
+    def parity(self):
+        return [a.to_bytes(self.shard_size, 'little') for a in self.acc]
@@ -0,0 +1,90 @@
+import math
+import threading
+import time
+from collections import deque
+
+# === NODE HEALTH ===
+# Nodes send a UDP heartbeat every HEARTBEAT_INTERVAL. The detector turns the silence since
+# the last one into a suspicion level (phi: -log10 of the chance a live node would be this
+# quiet, with exponentially distributed gaps). Suspected nodes are used last; dead ones are
+# dropped until they beat again. Breakers stop calls to a node that keeps failing them.
+HEARTBEAT_INTERVAL = 0.5 # Seconds between a node's heartbeats
+PHI_SUSPECT = 3.0        # ~7 missed intervals
+PHI_DEAD = 8.0           # ~18 missed intervals
+GAP_WINDOW = 100         # Heartbeat gaps remembered per node
+
+BREAKER_FAILURES = 3     # Consecutive failed calls that open a node's breaker
+BREAKER_RESET = 5.0      # Seconds open before one trial call is let through
+
+class FailureDetector:
+    def __init__(self):
+        self.last = {}  # node_id -> monotonic time of the last heartbeat
+        self.gaps = {}  # node_id -> recent gaps between heartbeats
+        self.load = {}  # node_id -> load reported in the last heartbeat
+        self.lock = threading.Lock()
+
+    def heartbeat(self, node_id, load=None):
+        now = time.monotonic()
+        with self.lock:
+            if node_id in self.last:
+                self.gaps.setdefault(node_id, deque(maxlen=GAP_WINDOW)).append(now - self.last[node_id])
+            self.last[node_id] = now
+            if load is not None: self.load[node_id] = load
+
+    def forget(self, node_id):
+        with self.lock:
+            self.last.pop(node_id, None)
+            self.gaps.pop(node_id, None)
+            self.load.pop(node_id, None)
+
+    def phi(self, node_id):
+        with self.lock:
+            if node_id not in self.last: return 0.0
+            gaps = self.gaps.get(node_id)
+            mean = max(sum(gaps) / len(gaps), HEARTBEAT_INTERVAL) if gaps else HEARTBEAT_INTERVAL
+            return (time.monotonic() - self.last[node_id]) / mean * math.log10(math.e)
+
+    def suspected(self, node_id):
+        return self.phi(node_id) > PHI_SUSPECT
+
+    def dead(self, node_id):
+        return self.phi(node_id) > PHI_DEAD
+
+class CircuitBreaker:
+    # Closed: calls go through. Open after BREAKER_FAILURES straight failures: calls fail fast.
+    # After BREAKER_RESET one trial call is allowed (half-open); its outcome closes or reopens.
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def available(self):
+        # Would a call be let through? (Doesn't claim the half-open trial)
+        with self.lock: return self._available()
+
+    def allow(self):
+        # Claims the trial call when half-open; every allowed call must report its outcome
+        with self.lock:
+            if not self._available(): return False
+            if self.opened_at is not None: self.trial = True
+            return True
+
+    def _available(self):
+        return self.opened_at is None or (not self.trial and time.monotonic() - self.opened_at >= BREAKER_RESET)
+
+    def state(self):
+        with self.lock:
+            if self.opened_at is None: return "closed"
+            return "open" if self.trial or time.monotonic() - self.opened_at < BREAKER_RESET else "half-open"
+
+    def success(self):
+        with self.lock: self.failures, self.opened_at, self.trial = 0, None, False
+
+    def failure(self):
+        # True when this failure opened the breaker
+        with self.lock:
+            self.failures += 1
+            if not self.trial and (self.opened_at is not None or self.failures < BREAKER_FAILURES): return False
+            self.opened_at, self.trial = time.monotonic(), False
+            return True
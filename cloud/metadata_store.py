@@ -0,0 +1,242 @@
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    hash TEXT PRIMARY KEY, filename TEXT NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS document_chunks (
+    doc_hash TEXT NOT NULL, idx INTEGER NOT NULL, chunk_id TEXT NOT NULL,
+    offset INTEGER NOT NULL, size INTEGER NOT NULL,
+    PRIMARY KEY (doc_hash, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS document_chunks_by_chunk ON document_chunks (chunk_id);
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY, size INTEGER NOT NULL, refs INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chunk_nodes (
+    chunk_id TEXT NOT NULL, node_id TEXT NOT NULL,
+    PRIMARY KEY (chunk_id, node_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS chunk_nodes_by_node ON chunk_nodes (node_id, chunk_id);
+CREATE TABLE IF NOT EXISTS document_parity (
+    doc_hash TEXT NOT NULL, stripe INTEGER NOT NULL, shard INTEGER NOT NULL,
+    chunk_id TEXT NOT NULL, size INTEGER NOT NULL,
+    PRIMARY KEY (doc_hash, stripe, shard)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS document_parity_by_chunk ON document_parity (chunk_id);
+CREATE TABLE IF NOT EXISTS slabs (
+    node_id TEXT NOT NULL, idx INTEGER NOT NULL, offset INTEGER NOT NULL, size INTEGER NOT NULL,
+    PRIMARY KEY (node_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS node_usage (
+    node_id TEXT PRIMARY KEY, chunk_count INTEGER NOT NULL, bytes_used INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Columns added after the first release: (table, column, definition)
+COLUMNS = [
+    ("documents", "replicas", "INTEGER NOT NULL DEFAULT 1"),
+    ("documents", "mode", "TEXT NOT NULL DEFAULT 'replicated'"),
+    ("documents", "ec_k", "INTEGER NOT NULL DEFAULT 0"),
+    ("documents", "ec_m", "INTEGER NOT NULL DEFAULT 0"),
+    ("documents", "chunk_size", "INTEGER NOT NULL DEFAULT 0"),
+    ("documents", "compression", "TEXT NOT NULL DEFAULT 'none'"),
+    # Chunks stored compressed: size is the stored size, raw_size the original one
+    ("chunks", "codec", "TEXT NOT NULL DEFAULT 'none'"),
+    ("chunks", "raw_size", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+class MetadataStore:
+    # Durable document/chunk metadata for CivicCloudManager (SQLite in WAL mode).
+    # Documents are indexed by hash and chunk placements by node, so per-node queries
+    # only touch that node's rows.
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+            for table, column, definition in COLUMNS:
+                if column not in [r['name'] for r in self.db.execute(f"PRAGMA table_info({table})")]:
+                    self.db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            if not self.db.execute("SELECT 1 FROM node_usage LIMIT 1").fetchall():
+                # Stores created before the counters existed: build them once
+                with self.db:
+                    self.db.execute("INSERT INTO node_usage SELECT n.node_id, COUNT(*), SUM(c.size) FROM chunk_nodes n "
+                                    "JOIN chunks c ON c.chunk_id = n.chunk_id GROUP BY n.node_id")
+
+    def query(self, sql, args=()):
+        with self.lock: return self.db.execute(sql, args).fetchall()
+
+    # --- DOCUMENTS ---
+    def count_documents(self):
+        return self.query("SELECT COUNT(*) FROM documents")[0][0]
+
+    def has_document(self, doc_hash):
+        return bool(self.query("SELECT 1 FROM documents WHERE hash = ?", (doc_hash,)))
+
+    def get_document(self, doc_hash):
+        # Same shape the manager used for file_map entries; each chunk lists every node holding it.
+        # Erasure-coded documents also carry their parity shards per stripe.
+        doc = self.query("SELECT filename, size, replicas, mode, ec_k, ec_m, chunk_size, compression FROM documents WHERE hash = ?", (doc_hash,))
+        if not doc: return None
+        rows = self.query(
+            "SELECT d.idx, d.chunk_id, d.offset, d.size, GROUP_CONCAT(n.node_id) AS nodes FROM document_chunks d "
+            "LEFT JOIN chunk_nodes n ON n.chunk_id = d.chunk_id WHERE d.doc_hash = ? GROUP BY d.idx ORDER BY d.idx", (doc_hash,))
+        chunks = [{"chunk_id": r['chunk_id'], "nodes": r['nodes'].split(',') if r['nodes'] else [], "index": r['idx'], "offset": r['offset'], "size": r['size']} for r in rows]
+        meta = dict(doc[0])
+        meta['chunks'] = chunks
+        meta['parity'] = {}
+        if meta['mode'] == 'erasure':
+            rows = self.query(
+                "SELECT p.stripe, p.shard, p.chunk_id, p.size, GROUP_CONCAT(n.node_id) AS nodes FROM document_parity p "
+                "LEFT JOIN chunk_nodes n ON n.chunk_id = p.chunk_id WHERE p.doc_hash = ? GROUP BY p.stripe, p.shard", (doc_hash,))
+            for r in rows:
+                meta['parity'].setdefault(r['stripe'], {})[r['shard']] = {"chunk_id": r['chunk_id'], "nodes": r['nodes'].split(',') if r['nodes'] else [], "size": r['size']}
+        return meta
+
+    def add_document(self, doc_hash, filename, size, chunk_map, replicas=1, mode='replicated', ec_k=0, ec_m=0, parity_map=(), chunk_size=0, compression='none'):
+        # False if the document already exists
+        with self.lock, self.db:
+            cur = self.db.execute("INSERT OR IGNORE INTO documents (hash, filename, size, created, replicas, mode, ec_k, ec_m, chunk_size, compression) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  (doc_hash, filename, size, time.time(), replicas, mode, ec_k, ec_m, chunk_size, compression))
+            if not cur.rowcount: return False
+            self.db.executemany("INSERT INTO document_chunks VALUES (?, ?, ?, ?, ?)",
+                                [(doc_hash, c['index'], c['chunk_id'], c['offset'], c['size']) for c in chunk_map])
+            self.db.executemany("INSERT INTO document_parity VALUES (?, ?, ?, ?, ?)",
+                                [(doc_hash, p['stripe'], p['shard'], p['chunk_id'], p['size']) for p in parity_map])
+            return True
+
+    def delete_document(self, doc_hash):
+        # Drops the document and its references on its chunks; returns those chunk ids
+        # (a chunk used twice appears twice), or None if there was no such document
+        with self.lock, self.db:
+            ids = [r[0] for r in self.db.execute("SELECT chunk_id FROM document_chunks WHERE doc_hash = ? UNION ALL "
+                                                 "SELECT chunk_id FROM document_parity WHERE doc_hash = ?", (doc_hash, doc_hash))]
+            if not self.db.execute("DELETE FROM documents WHERE hash = ?", (doc_hash,)).rowcount: return None
+            self.db.execute("DELETE FROM document_chunks WHERE doc_hash = ?", (doc_hash,))
+            self.db.execute("DELETE FROM document_parity WHERE doc_hash = ?", (doc_hash,))
+            self.db.executemany("UPDATE chunks SET refs = refs - 1 WHERE chunk_id = ?", [(c,) for c in ids])
+            return ids
+
+    # --- CHUNKS ---
+    def get_chunk(self, chunk_id):
+        rows = self.query("SELECT c.size, c.refs, c.codec, c.raw_size, n.node_id FROM chunks c JOIN chunk_nodes n ON n.chunk_id = c.chunk_id WHERE c.chunk_id = ?", (chunk_id,))
+        if not rows: return None
+        r = rows[0]
+        return {'nodes': [r['node_id'] for r in rows], 'size': r['size'], 'refs': r['refs'], 'codec': r['codec'], 'raw_size': r['raw_size'] or r['size']}
+
+    def add_chunk(self, chunk_id, node_ids, size, refs=1, codec='none', raw_size=0):
+        # size: bytes stored per copy (what node usage counts); raw_size: before compression.
+        # A row can outlive its last copy (node removed, corrupt copy dropped): it keeps the
+        # references of the documents still using it and takes on the new copies' format.
+        with self.lock, self.db:
+            self.db.execute("INSERT INTO chunks (chunk_id, size, refs, codec, raw_size) VALUES (?, ?, ?, ?, ?) "
+                            "ON CONFLICT (chunk_id) DO UPDATE SET size = excluded.size, refs = refs + excluded.refs, "
+                            "codec = excluded.codec, raw_size = excluded.raw_size", (chunk_id, size, refs, codec, raw_size or size))
+            self.place(chunk_id, node_ids, size)
+
+    def add_replicas(self, chunk_id, node_ids, size):
+        with self.lock, self.db: self.place(chunk_id, node_ids, size)
+
+    def place(self, chunk_id, node_ids, size):
+        # Caller holds the lock and the transaction
+        for node_id in node_ids:
+            self.db.execute("INSERT INTO chunk_nodes VALUES (?, ?)", (chunk_id, node_id))
+            self.count_usage(node_id, 1, size)
+
+    def count_usage(self, node_id, chunks, size):
+        # Caller holds the lock and the transaction that moves the chunk
+        self.db.execute("INSERT INTO node_usage VALUES (?, ?, ?) ON CONFLICT (node_id) DO UPDATE SET "
+                        "chunk_count = chunk_count + excluded.chunk_count, bytes_used = bytes_used + excluded.bytes_used",
+                        (node_id, chunks, size))
+
+    def ref_chunks(self, chunk_ids, delta):
+        with self.lock, self.db:
+            self.db.executemany("UPDATE chunks SET refs = refs + ? WHERE chunk_id = ?", [(delta, c) for c in chunk_ids])
+
+    def chunk_documents(self, chunk_id):
+        # Documents using the chunk as a data or parity shard
+        return [r['doc_hash'] for r in self.query(
+            "SELECT doc_hash FROM document_chunks WHERE chunk_id = ? UNION SELECT doc_hash FROM document_parity WHERE chunk_id = ?", (chunk_id, chunk_id))]
+
+    def garbage_chunks(self):
+        # chunk_id -> (size, [node_id]) for chunks no document references any more
+        garbage = {}
+        for r in self.query("SELECT c.chunk_id, c.size, n.node_id FROM chunks c LEFT JOIN chunk_nodes n "
+                            "ON n.chunk_id = c.chunk_id WHERE c.refs <= 0"):
+            nodes = garbage.setdefault(r['chunk_id'], (r['size'], []))[1]
+            if r['node_id']: nodes.append(r['node_id'])
+        return garbage
+
+    def movable_chunks(self, node_id):
+        # (chunk_id, size) of live replicated chunks on the node, largest first. Erasure-coded
+        # shards stay put: moving one could land two shards of a stripe on the same node.
+        return [(r[0], r[1]) for r in self.query(
+            "SELECT c.chunk_id, c.size FROM chunk_nodes n JOIN chunks c ON c.chunk_id = n.chunk_id "
+            "WHERE n.node_id = ? AND c.refs > 0 AND NOT EXISTS (SELECT 1 FROM document_parity p WHERE p.chunk_id = c.chunk_id) "
+            "AND NOT EXISTS (SELECT 1 FROM document_chunks d JOIN documents doc ON doc.hash = d.doc_hash "
+            "WHERE d.chunk_id = c.chunk_id AND doc.mode = 'erasure') ORDER BY c.size DESC", (node_id,))]
+
+    def move_replica(self, chunk_id, src, dst, size):
+        # One transaction, so readers see the chunk on src or on dst, never on neither
+        with self.lock, self.db:
+            if self.db.execute("DELETE FROM chunk_nodes WHERE chunk_id = ? AND node_id = ?", (chunk_id, src)).rowcount:
+                self.count_usage(src, -1, -size)
+            self.place(chunk_id, [dst], size)
+
+    def drop_replica(self, chunk_id, node_id, size):
+        with self.lock, self.db:
+            if self.db.execute("DELETE FROM chunk_nodes WHERE chunk_id = ? AND node_id = ?", (chunk_id, node_id)).rowcount:
+                self.count_usage(node_id, -1, -size)
+
+    def drop_chunks(self, chunk_ids):
+        # Forgets unreferenced chunks that no node holds any more
+        with self.lock, self.db:
+            self.db.executemany("DELETE FROM chunks WHERE chunk_id = ? AND refs <= 0 AND NOT EXISTS "
+                                "(SELECT 1 FROM chunk_nodes n WHERE n.chunk_id = chunks.chunk_id)", [(c,) for c in chunk_ids])
+
+    # --- NODES ---
+    def node_usage(self):
+        # node_id -> (chunk_count, bytes_used), kept current on every placement change
+        return {r[0]: (r[1], r[2]) for r in self.query("SELECT node_id, chunk_count, bytes_used FROM node_usage")}
+
+    def node_raw_usage(self):
+        # node_id -> bytes held before compression (node_usage counts bytes as stored)
+        return {r[0]: r[1] for r in self.query(
+            "SELECT n.node_id, SUM(CASE WHEN c.raw_size > 0 THEN c.raw_size ELSE c.size END) FROM chunk_nodes n "
+            "JOIN chunks c ON c.chunk_id = n.chunk_id GROUP BY n.node_id")}
+
+    def node_chunks(self, node_id):
+        # Parity shards are listed under their stripe number
+        return self.query(
+            "SELECT doc.filename, d.chunk_id, d.idx, d.size FROM chunk_nodes n "
+            "JOIN document_chunks d ON d.chunk_id = n.chunk_id JOIN documents doc ON doc.hash = d.doc_hash "
+            "WHERE n.node_id = ? UNION ALL "
+            "SELECT doc.filename || ' (parity)', p.chunk_id, p.stripe, p.size FROM chunk_nodes n "
+            "JOIN document_parity p ON p.chunk_id = n.chunk_id JOIN documents doc ON doc.hash = p.doc_hash "
+            "WHERE n.node_id = ?", (node_id, node_id))
+
+    def forget_node(self, node_id):
+        # The node's copies are gone for good: drop its placements, counters and slabs
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM chunk_nodes WHERE node_id = ?", (node_id,))
+            self.db.execute("DELETE FROM node_usage WHERE node_id = ?", (node_id,))
+            self.db.execute("DELETE FROM slabs WHERE node_id = ?", (node_id,))
+
+    # --- DISK LAYOUT ---
+    def node_slabs(self, node_id):
+        # [(disk offset, size)] in grant order, which is the order the node addresses them in
+        return [(r[0], r[1]) for r in self.query("SELECT offset, size FROM slabs WHERE node_id = ? ORDER BY idx", (node_id,))]
+
+    def all_slabs(self):
+        return [(r[0], r[1]) for r in self.query("SELECT offset, size FROM slabs ORDER BY offset")]
+
+    def add_slab(self, node_id, offset, size):
+        with self.lock, self.db:
+            self.db.execute("INSERT INTO slabs VALUES (?, (SELECT COUNT(*) FROM slabs WHERE node_id = ?), ?, ?)", (node_id, node_id, offset, size))
+
@@ -0,0 +1,209 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+import psutil
+
+# === METRICS ===
+# Counters, gauges and histograms kept in manager memory and served as Prometheus text on
+# http://<host>:<port>/metrics. Families are declared once in ManagerMetrics; a background
+# collector samples the manager and node processes (CPU, RSS, disk I/O) and turns the
+# per-node byte counters into a recent bytes/s figure.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60) # Seconds
+COLLECT_INTERVAL = 5.0 # Seconds between process samples
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def label_text(names, values, extra=()):
+    pairs = [f'{n}="{escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Family:
+    # One metric name; values are keyed by their label values, in `labels` order
+    def __init__(self, name, kind, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.kind, self.help, self.labels = name, kind, help, tuple(labels)
+        self.buckets = buckets
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def inc(self, amount=1, **labels):
+        # Returns the new value
+        key = self.key(labels)
+        with self.lock:
+            value = self.values[key] = self.values.get(key, 0) + amount
+            return value
+
+    def set(self, value, **labels):
+        with self.lock: self.values[self.key(labels)] = value
+
+    def observe(self, value, **labels):
+        # Histograms: per-bucket counts (the last one is +Inf), then the sum
+        key = self.key(labels)
+        with self.lock:
+            counts = self.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def snapshot(self):
+        with self.lock: return {k: list(v) if isinstance(v, list) else v for k, v in self.values.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.snapshot().items()):
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{label_text(self.labels, key)} {value}")
+                continue
+            total = 0
+            for le, count in zip(self.buckets + ("+Inf",), value[:-1]):
+                total += count
+                le = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{label_text(self.labels, key, [le])} {total}")
+            lines.append(f"{self.name}_sum{label_text(self.labels, key)} {value[-1]}")
+            lines.append(f"{self.name}_count{label_text(self.labels, key)} {total}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.families = []
+
+    def add(self, name, kind, help, labels=(), **kw):
+        family = Family(name, kind, help, labels, **kw)
+        self.families.append(family)
+        return family
+
+    def render(self):
+        return "\n".join(line for f in self.families for line in f.render()) + "\n"
+
+class ManagerMetrics(Registry):
+    def __init__(self):
+        super().__init__()
+        # --- gRPC ---
+        self.rpc_latency = self.add("civic_rpc_duration_seconds", "histogram", "Time to serve a CivicCloudService call (streams: until the last message)", ("method",))
+        self.rpc_errors = self.add("civic_rpc_errors_total", "counter", "Calls that failed (code FAILED: answered with a failure result)", ("method", "code"))
+        self.rpc_active = self.add("civic_rpc_active", "gauge", "Calls being served")
+        self.rpc_workers = self.add("civic_rpc_workers", "gauge", "gRPC server worker threads")
+        self.rpc_saturation = self.add("civic_rpc_pool_saturation", "gauge", "Calls being served / worker threads (1 = new calls queue)")
+        # --- Nodes ---
+        self.node_latency = self.add("civic_node_call_duration_seconds", "histogram", "Manager -> node call time", ("node", "op"))
+        self.node_errors = self.add("civic_node_errors_total", "counter", "Manager -> node calls that failed", ("node", "op"))
+        self.node_inflight = self.add("civic_node_inflight_calls", "gauge", "Manager -> node calls in progress", ("node",))
+        self.node_bytes = self.add("civic_node_bytes_total", "counter", "Chunk bytes moved to (write) or from (read) a node", ("node", "direction"))
+        self.node_rate = self.add("civic_node_bytes_per_second", "gauge", f"Chunk bytes/s to or from a node over the last {COLLECT_INTERVAL:g}s", ("node", "direction"))
+        # --- Processes ---
+        self.process_cpu = self.add("civic_process_cpu_seconds_total", "counter", "User + system CPU time", ("process",))
+        self.process_cpu_percent = self.add("civic_process_cpu_percent", "gauge", f"CPU use over the last {COLLECT_INTERVAL:g}s (100 = one core)", ("process",))
+        self.process_rss = self.add("civic_process_resident_memory_bytes", "gauge", "Resident memory", ("process",))
+        self.process_io = self.add("civic_process_io_bytes_total", "counter", "Bytes read from / written to storage", ("process", "direction"))
+
+class RpcMetrics(grpc.ServerInterceptor):
+    # Times every servicer method and counts calls that end in an error status
+    def __init__(self, metrics, workers):
+        self.metrics, self.workers = metrics, workers
+        metrics.rpc_workers.set(workers)
+
+    def intercept_service(self, continuation, details):
+        handler = continuation(details)
+        if handler is None: return None
+        method = details.method.rsplit("/", 1)[-1]
+        if handler.unary_unary: return handler._replace(unary_unary=self.timed(handler.unary_unary, method))
+        if handler.stream_unary: return handler._replace(stream_unary=self.timed(handler.stream_unary, method))
+        if handler.unary_stream: return handler._replace(unary_stream=self.timed_stream(handler.unary_stream, method))
+        return handler._replace(stream_stream=self.timed_stream(handler.stream_stream, method))
+
+    def begin(self):
+        self.metrics.rpc_saturation.set(self.metrics.rpc_active.inc() / self.workers)
+        return time.perf_counter()
+
+    def end(self, method, context, started, failed):
+        self.metrics.rpc_saturation.set(self.metrics.rpc_active.inc(-1) / self.workers)
+        self.metrics.rpc_latency.observe(time.perf_counter() - started, method=method)
+        code = context.code() if hasattr(context, "code") else None # Set by abort() / set_code()
+        if failed or code not in (None, grpc.StatusCode.OK):
+            self.metrics.rpc_errors.inc(method=method, code=(code or grpc.StatusCode.UNKNOWN).name)
+
+    def timed(self, fn, method):
+        def call(request, context):
+            started, failed = self.begin(), True
+            try:
+                reply = fn(request, context)
+                failed = False
+                return reply
+            finally: self.end(method, context, started, failed)
+        return call
+
+    def timed_stream(self, fn, method):
+        def call(request, context):
+            started, failed = self.begin(), True
+            try:
+                yield from fn(request, context)
+                failed = False
+            finally: self.end(method, context, started, failed)
+        return call
+
+class Collector:
+    # Samples processes ({label: pid} from `processes`) and node throughput every COLLECT_INTERVAL
+    def __init__(self, metrics, processes):
+        self.metrics, self.processes = metrics, processes
+        self.handles = {} # pid -> psutil.Process (cpu_percent measures between calls on one handle)
+        self.last_bytes, self.last_time = {}, time.monotonic()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        while True:
+            time.sleep(COLLECT_INTERVAL)
+            try: self.collect()
+            except Exception as e: print(f"⚠️ Metrics collection failed: {e}")
+
+    def collect(self):
+        m = self.metrics
+        pids = self.processes()
+        for pid in set(self.handles) - set(pids.values()): del self.handles[pid]
+        for name, pid in pids.items():
+            try:
+                proc = self.handles.get(pid) or self.handles.setdefault(pid, psutil.Process(pid))
+                with proc.oneshot():
+                    cpu = proc.cpu_times()
+                    m.process_cpu.set(round(cpu.user + cpu.system, 2), process=name)
+                    m.process_cpu_percent.set(proc.cpu_percent(), process=name)
+                    m.process_rss.set(proc.memory_info().rss, process=name)
+                    if hasattr(proc, "io_counters"): # Not available on macOS
+                        io = proc.io_counters()
+                        m.process_io.set(io.read_bytes, process=name, direction="read")
+                        m.process_io.set(io.write_bytes, process=name, direction="write")
+            except psutil.Error: self.handles.pop(pid, None) # Exited (or not ours to inspect)
+        now, totals = time.monotonic(), m.node_bytes.snapshot()
+        elapsed = max(now - self.last_time, 1e-6)
+        for (node, direction), total in totals.items():
+            m.node_rate.set(round((total - self.last_bytes.get((node, direction), 0)) / elapsed), node=node, direction=direction)
+        self.last_bytes, self.last_time = totals, now
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): pass # Scrapes every few seconds would flood the console
+
+def serve_metrics(registry, port):
+    handler = type("Handler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer(("0.0.0.0", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
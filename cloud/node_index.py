@@ -0,0 +1,145 @@
+import bisect
+import json
+import os
+import threading
+
+# Journal records appended before they are folded into a new checkpoint
+CHECKPOINT_EVERY = 1000
+# fsync each journal record (a crash then loses at most the write in progress)
+JOURNAL_FSYNC = True
+
+class NodeIndex:
+    # A node's FAT (chunk id -> extent in its partition), persisted as a checkpoint file
+    # plus an append-only journal. Each write costs one journal line; every CHECKPOINT_EVERY
+    # records the journal is compacted into a fresh checkpoint, which bounds restart time.
+    def __init__(self, base):
+        self.checkpoint_file = f"{base}.json"
+        self.journal_file = f"{base}.journal"
+        self.fat = {}
+        self.lock = threading.Lock()
+        self.journal_records = self.recover()
+        self.journal = open(self.journal_file, 'ab')
+
+    def recover(self):
+        if os.path.exists(self.checkpoint_file):
+            try:
+                with open(self.checkpoint_file, 'r') as f:
+                    saved = json.load(f)
+                # Older nodes saved the bare FAT dict
+                self.fat = saved['fat'] if saved.get('version') == 1 else saved
+            except ValueError:
+                print(f"⚠️ Index checkpoint {self.checkpoint_file} unreadable, rebuilding from journal")
+        if not os.path.exists(self.journal_file): return 0
+
+        records, good_end = 0, 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try: rec = json.loads(line)
+                except ValueError: break # Torn tail from a crash mid-append
+                if not line.endswith(b"\n"): break
+                self.apply(rec)
+                records += 1
+                good_end += len(line)
+        if good_end < os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f: f.truncate(good_end)
+        return records
+
+    def apply(self, rec):
+        if rec['op'] == 'put':
+            self.fat[rec['id']] = rec['entry']
+        elif rec['op'] == 'del':
+            self.fat.pop(rec['id'], None)
+
+    def put(self, chunk_id, entry):
+        with self.lock:
+            self.append({'op': 'put', 'id': chunk_id, 'entry': entry})
+            self.fat[chunk_id] = entry
+            if self.journal_records >= CHECKPOINT_EVERY: self.checkpoint()
+
+    def delete(self, chunk_id, entry=None):
+        # Returns the removed entry (None if it wasn't there, or wasn't `entry` when one is given)
+        with self.lock:
+            if chunk_id not in self.fat or (entry is not None and self.fat[chunk_id] != entry): return None
+            self.append({'op': 'del', 'id': chunk_id})
+            entry = self.fat.pop(chunk_id)
+            if self.journal_records >= CHECKPOINT_EVERY: self.checkpoint()
+            return entry
+
+    def move(self, chunk_id, old, new):
+        # Repoints a chunk at a copy of its extent, unless it was deleted or moved meanwhile
+        with self.lock:
+            if self.fat.get(chunk_id) != old: return False
+            self.append({'op': 'put', 'id': chunk_id, 'entry': new})
+            self.fat[chunk_id] = new
+            if self.journal_records >= CHECKPOINT_EVERY: self.checkpoint()
+            return True
+
+    def append(self, rec):
+        self.journal.write(json.dumps(rec).encode() + b"\n")
+        self.journal.flush()
+        if JOURNAL_FSYNC: os.fsync(self.journal.fileno())
+        self.journal_records += 1
+
+    def checkpoint(self):
+        # Write-then-rename, so the checkpoint is never torn; replaying a journal that
+        # outlived its checkpoint is harmless because records are idempotent.
+        tmp = self.checkpoint_file + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'version': 1, 'fat': self.fat}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_file)
+        self.journal.close()
+        self.journal = open(self.journal_file, 'wb')
+        self.journal_records = 0
+
+class PartitionFull(Exception):
+    pass
+
+class ExtentAllocator:
+    # Hands out byte ranges of a node's partition. reserve() is atomic, so concurrent writes
+    # get disjoint extents and fill them in parallel; an extent whose write fails is
+    # released and reused instead of leaking. Gaps left by the index at startup are reused too.
+    def __init__(self, extents, capacity=0):
+        self.lock = threading.Lock()
+        self.capacity = capacity # Bytes granted to the node; nothing fits until it has some
+        self.free = [] # Sorted, coalesced (offset, size) gaps below self.end
+        self.end = 0
+        for offset, size in sorted((e['offset'], e['size']) for e in extents):
+            if offset > self.end: self.free.append((self.end, offset - self.end))
+            self.end = max(self.end, offset + size)
+
+    def reserve(self, size, below=None):
+        # With `below`, only a gap ending at or before that offset will do (None if there is none)
+        with self.lock:
+            for i, (offset, gap) in enumerate(self.free): # First fit
+                if below is not None and offset + size > below: return None
+                if gap >= size:
+                    if gap == size: del self.free[i]
+                    else: self.free[i] = (offset + size, gap - size)
+                    return offset
+            if below is not None: return None
+            if self.end + size > self.capacity:
+                raise PartitionFull(f"{size}b does not fit: {max(0, self.capacity - self.end)}b left at the end of the partition")
+            offset, self.end = self.end, self.end + size
+            return offset
+
+    def release(self, offset, size):
+        if not size: return
+        with self.lock:
+            i = bisect.bisect(self.free, (offset, size))
+            if i < len(self.free) and offset + size == self.free[i][0]: # Merge with the next gap
+                size += self.free.pop(i)[1]
+            if i and self.free[i - 1][0] + self.free[i - 1][1] == offset: # And the previous one
+                i -= 1
+                offset, size = self.free[i][0], self.free[i][1] + size
+                del self.free[i]
+            if offset + size == self.end: self.end = offset # Gap at the end: just pull the end back
+            else: self.free.insert(i, (offset, size))
+
+    def gap_bytes(self):
+        # Free space stranded below the end of the last extent
+        with self.lock: return sum(size for _, size in self.free)
+
+    def free_bytes(self):
+        with self.lock: return sum(size for _, size in self.free) + max(0, self.capacity - self.end)
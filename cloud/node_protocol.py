@@ -0,0 +1,164 @@
+import asyncio
+import socket
+import struct
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# === BINARY FRAME PROTOCOL (Manager <-> CivicNode) ===
+# Fixed header, then the key (chunk id) bytes, then payload_len raw payload bytes:
+#   magic(2) | version(1) | command(1) | status(1) | pad(1) | key_len(2) | arg0(8) | arg1(8) | payload_len(8)
+MAGIC = b"CV"
+VERSION = 1
+HEADER = struct.Struct('>2sBBBxHQQQ')
+
+# Commands (replies echo the request's command)
+ASSIGN_PARTITION = 1  # payload = JSON {"slabs": [[disk offset, size], ...]}, the node's whole layout
+WRITE = 2             # key = chunk id, payload = chunk bytes as stored, arg0 = codec id (chunk_codec), arg1 = size uncompressed
+READ = 3              # key = chunk id, arg0 = offset in chunk, arg1 = length (0 = to end)
+PING = 4              # health check for pooled connections
+STATS = 5             # reply payload = JSON counters (chunk cache, free space, fragmentation)
+DELETE = 6            # key = chunk id; frees its extent once in-flight reads finish
+
+# Reply status
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_NOT_FOUND = 2
+STATUS_BAD_VERSION = 3
+STATUS_FULL = 4  # WRITE: no extent of that size left; arg0 = the node's current capacity
+STATUS_CORRUPT = 5 # READ: the copy failed its checksum; the node dropped it and reported it for repair
+
+# Payloads below this size are sent in the same sendall as the header
+COALESCE_LIMIT = 64 * 1024
+
+# Connection pool limits (per node)
+POOL_MAX_PER_NODE = 8
+POOL_IDLE_CHECK = 30  # Seconds idle before a pooled connection is pinged on checkout
+# Deadlines on node I/O, so a hung node fails the call instead of holding the caller's thread
+CONNECT_TIMEOUT = 2.0 # Seconds to open a connection
+IO_TIMEOUT = 5.0      # Seconds any single send/receive may block
+POOL_WAIT_TIMEOUT = IO_TIMEOUT # Seconds to wait for a free connection slot
+
+Frame = namedtuple('Frame', 'command status key arg0 arg1 length')
+
+class ProtocolError(Exception):
+    pass
+
+def tune_socket(sock):
+    # Header and payload go out as separate writes; don't let Nagle hold the second one back
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+def pack_header(command, key="", arg0=0, arg1=0, length=0, status=STATUS_OK):
+    key = key.encode() if isinstance(key, str) else key
+    return HEADER.pack(MAGIC, VERSION, command, status, len(key), arg0, arg1, length) + key
+
+def send_frame(sock, command, key="", arg0=0, arg1=0, payload=b"", status=STATUS_OK, payload_len=None):
+    # Pass payload_len without a payload to stream the body separately (e.g. with sendfile)
+    length = len(payload) if payload_len is None else payload_len
+    header = pack_header(command, key, arg0, arg1, length, status)
+    if payload and len(payload) <= COALESCE_LIMIT:
+        sock.sendall(header + bytes(payload))
+        return
+    sock.sendall(header)
+    if payload: sock.sendall(payload)
+
+def recv_exact_into(sock, view):
+    view = memoryview(view).cast('B')
+    while view:
+        n = sock.recv_into(view)
+        if not n: raise ConnectionError("Connection closed mid-frame")
+        view = view[n:]
+
+def unpack_header(raw):
+    # -> (command, status, key_len, arg0, arg1, length)
+    magic, version, command, status, key_len, arg0, arg1, length = HEADER.unpack(raw)
+    if magic != MAGIC: raise ProtocolError("Bad frame magic")
+    if version != VERSION: raise ProtocolError(f"Unsupported frame version {version}")
+    return command, status, key_len, arg0, arg1, length
+
+def recv_frame(sock):
+    # Returns None on a clean close between frames
+    raw = bytearray(HEADER.size)
+    first = sock.recv_into(raw)
+    if not first: return None
+    recv_exact_into(sock, memoryview(raw)[first:])
+    command, status, key_len, arg0, arg1, length = unpack_header(raw)
+    key = bytearray(key_len)
+    recv_exact_into(sock, key)
+    return Frame(command, status, key.decode(), arg0, arg1, length)
+
+async def read_frame(reader):
+    # recv_frame for an asyncio StreamReader
+    try: raw = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial: return None
+        raise ConnectionError("Connection closed mid-frame")
+    command, status, key_len, arg0, arg1, length = unpack_header(raw)
+    key = await reader.readexactly(key_len)
+    return Frame(command, status, key.decode(), arg0, arg1, length)
+
+def recv_payload(sock, length):
+    buf = bytearray(length)
+    recv_exact_into(sock, buf)
+    return buf
+
+def ping(sock):
+    try:
+        send_frame(sock, PING)
+        reply = recv_frame(sock)
+        return reply is not None and reply.status == STATUS_OK
+    except OSError: return False
+
+class NodeConnectionPool:
+    # Bounded set of long-lived connections to one node. A node serves commands on a
+    # connection until it is closed, so a connection is reused for many chunk transfers.
+    def __init__(self, ip, port, max_size=POOL_MAX_PER_NODE):
+        self.address = (ip, port)
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.idle = [] # (socket, last_used)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @contextmanager
+    def connection(self):
+        # Any exception inside the block discards the connection: it may hold half a frame.
+        # Sockets time out (socket.timeout, an OSError) after IO_TIMEOUT without progress.
+        if not self.slots.acquire(timeout=POOL_WAIT_TIMEOUT): raise TimeoutError(f"No free connection to {self.address}")
+        sock = None
+        try:
+            sock = self._checkout()
+            yield sock
+        except BaseException:
+            if sock: sock.close()
+            sock = None
+            raise
+        finally:
+            if sock: self._checkin(sock)
+            self.slots.release()
+
+    def _checkout(self):
+        while True:
+            with self.lock:
+                if self.closed: raise ConnectionError("Pool closed")
+                if not self.idle: break
+                sock, last_used = self.idle.pop()
+            if time.monotonic() - last_used < POOL_IDLE_CHECK or ping(sock): return sock
+            sock.close()
+        sock = tune_socket(socket.create_connection(self.address, timeout=CONNECT_TIMEOUT))
+        sock.settimeout(IO_TIMEOUT)
+        return sock
+
+    def _checkin(self, sock):
+        with self.lock:
+            if not self.closed:
+                self.idle.append((sock, time.monotonic()))
+                return
+        sock.close()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for sock, _ in idle: sock.close()
@@ -9,5 +9,16 @@ app_password = "vrwt uihw cnpg cgop"
 
 # Cloud Storage Limits
 MAX_FILE_SIZE = 3 * 1024 * 1024 * 1024  # 3GB Limit
-CHUNK_SIZE = 2 * 1024 * 1024     # 2MB Chunks (Better for speed)
-MAX_NODES_PER_FILE = 3
\ No newline at end of file
+# Chunk size: a document is cut into about CHUNKS_PER_NODE chunks per online node, clamped to
+# [MIN_CHUNK_SIZE, MAX_CHUNK_SIZE]. CHUNK_SIZE is used when the size isn't known up front.
+CHUNK_SIZE = int(os.getenv("CIVIC_CHUNK_SIZE", 8 * 1024 * 1024))
+MIN_CHUNK_SIZE = int(os.getenv("CIVIC_MIN_CHUNK_SIZE", 4 * 1024 * 1024))
+MAX_CHUNK_SIZE = int(os.getenv("CIVIC_MAX_CHUNK_SIZE", 32 * 1024 * 1024))
+CHUNKS_PER_NODE = int(os.getenv("CIVIC_CHUNKS_PER_NODE", 8))
+MAX_NODES_PER_FILE = 3
+REPLICATION_FACTOR = 2  # Copies of each chunk unless a document asks otherwise (capped by MAX_NODES_PER_FILE)
+STORAGE_MODE = "replicated"  # or "erasure": k data + m parity shards per stripe
+EC_DATA_SHARDS = 2
+EC_PARITY_SHARDS = 1
+PLACEMENT_POLICY = os.getenv("CIVIC_PLACEMENT", "rendezvous")  # or "modulo" (see placement.py)
+COMPRESSION = os.getenv("CIVIC_COMPRESSION", "none")  # Default per document: "zlib", "lzma" or "zstd" (needs zstandard)
@@ -0,0 +1,31 @@
+import hashlib
+import math
+
+# === CHUNK PLACEMENT ===
+# A policy orders the online nodes for a key (a chunk id, or an upload's stripe). Copies go
+# to the first nodes of that order and the rest are fallbacks when a write fails.
+# weights: node_id -> relative share (free space and speed), ignored by "modulo".
+
+def key_hash(*parts):
+    return int.from_bytes(hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).digest(), 'big')
+
+class ModuloPlacement:
+    # Hash of the key modulo the node count, then the following nodes in order. Even, but
+    # nearly every key moves when the node count changes.
+    def rank(self, key, node_ids, weights=None):
+        nodes = sorted(node_ids, key=int)
+        start = key_hash(key) % len(nodes)
+        return nodes[start:] + nodes[:start]
+
+class RendezvousPlacement:
+    # Weighted rendezvous (highest random weight) hashing: node n scores -w(n) / ln(u) with
+    # u = hash(key, n) uniform in (0, 1), so each node wins keys in proportion to its weight
+    # and a node joining or leaving only moves the keys it wins or held.
+    def rank(self, key, node_ids, weights=None):
+        weights = weights or {}
+        def score(node_id):
+            u = (key_hash(key, node_id) + 0.5) / 2 ** 64
+            return -weights.get(node_id, 1.0) / math.log(u)
+        return sorted(node_ids, key=score, reverse=True)
+
+POLICIES = {"rendezvous": RendezvousPlacement, "modulo": ModuloPlacement}
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+from collections import deque
+import chunk_codec
+import node_protocol as proto
+
+# === REBALANCER ===
+# Evens out bytes stored per online node by moving replicated chunks from the fullest nodes
+# to the emptiest ones, one chunk at a time and throttled, so a node added at runtime picks
+# up its share of existing documents (and of their read load).
+REBALANCE_INTERVAL = 60               # Seconds between balance checks (a new node triggers one at once)
+REBALANCE_RATE = 32 * 1024 * 1024     # Bytes/s copied between nodes
+REBALANCE_MIN_SKEW = 64 * 1024 * 1024 # Nodes within this many bytes...
+REBALANCE_SKEW_RATIO = 0.10           # ...or this fraction of the mean are left alone
+SOURCE_GRACE = 30                     # Seconds a moved chunk stays on its old node for reads already routed there
+
+class Rebalancer:
+    def __init__(self, manager):
+        self.manager = manager
+        self.meta = manager.meta
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.retiring = deque() # (due, chunk_id, node_id) copies to delete after SOURCE_GRACE
+        self.offline = [] # Retiring copies whose node was down; retried next run
+        self.running = False
+        self.chunks_moved = self.bytes_moved = self.bytes_planned = 0
+
+    def start(self):
+        threading.Thread(target=self.run_forever, daemon=True).start()
+
+    def trigger(self):
+        self.wake.set()
+
+    def status(self):
+        with self.lock:
+            return {"running": self.running, "chunks_moved": self.chunks_moved, "bytes_moved": self.bytes_moved,
+                    "bytes_planned": self.bytes_planned, "bytes_remaining": max(0, self.bytes_planned - self.bytes_moved)}
+
+    def run_forever(self):
+        while True:
+            self.wake.wait(REBALANCE_INTERVAL)
+            self.wake.clear()
+            try: self.rebalance()
+            except Exception as e: print(f"⚠️ Rebalance failed: {e}")
+            finally:
+                with self.lock: self.running = False
+
+    def rebalance(self):
+        self.retiring.extend(self.offline)
+        self.offline = []
+        moves = self.plan()
+        if moves:
+            with self.lock:
+                self.running = True
+                self.chunks_moved = self.bytes_moved = 0
+                self.bytes_planned = sum(m[1] for m in moves)
+            print(f"⚖️ Rebalancing: {len(moves)} chunks, {self.bytes_planned}b")
+        for chunk_id, size, src, dst in moves:
+            self.retire_due()
+            if self.move(chunk_id, size, src, dst):
+                with self.lock:
+                    self.chunks_moved += 1
+                    self.bytes_moved += size
+            time.sleep(size / REBALANCE_RATE)
+        while self.retiring: # Finish the grace period of the last moves
+            time.sleep(max(0, self.retiring[0][0] - time.monotonic()))
+            self.retire_due()
+        if moves: print(f"⚖️ Rebalance done: {self.chunks_moved}/{len(moves)} chunks moved")
+
+    def plan(self):
+        # Greedy: the fullest node above the mean gives its largest chunks to the emptiest
+        # node below the mean that doesn't hold them, until both are close to the mean
+        online = self.manager.healthy_nodes()
+        if len(online) < 2: return []
+        usage = {n: self.meta.node_usage().get(n, (0, 0))[1] for n in online}
+        mean = sum(usage.values()) / len(online)
+        slack = max(REBALANCE_MIN_SKEW, REBALANCE_SKEW_RATIO * mean)
+        moves, planned = [], {} # chunk_id -> destinations already chosen this run
+        for src in sorted(online, key=lambda n: -usage[n]):
+            if usage[src] <= mean + slack: break
+            for chunk_id, size in self.meta.movable_chunks(src):
+                if usage[src] - size < mean: continue
+                holders = set(self.meta.get_chunk(chunk_id)['nodes']) | planned.get(chunk_id, set())
+                dst = min((n for n in online if n not in holders and usage[n] + size <= mean), key=usage.get, default=None)
+                if dst is None: continue
+                moves.append((chunk_id, size, src, dst))
+                planned.setdefault(chunk_id, set()).add(dst)
+                usage[src] -= size
+                usage[dst] += size
+                if usage[src] <= mean + slack / 2: break
+        return moves
+
+    def move(self, chunk_id, size, src, dst):
+        # Copy, then repoint the placement in one transaction; the source copy is deleted
+        # after SOURCE_GRACE. The chunk counts as in flight meanwhile, so uploads and the
+        # garbage sweep wait for the move instead of racing it.
+        m = self.manager
+        with m.chunk_lock:
+            entry = self.meta.get_chunk(chunk_id)
+            if chunk_id in m.inflight_chunks or not entry or src not in entry['nodes'] or dst in entry['nodes']: return False
+            done = m.inflight_chunks[chunk_id] = threading.Event()
+        try:
+            data = m.node_call(src, m.get_chunk_from_node, chunk_id)
+            if data is None or isinstance(data, proto.Frame) or hashlib.sha256(data).hexdigest() != chunk_id: return False
+            if not m.write_replica(dst, chunk_id, chunk_codec.pack(data, entry['codec'], sample=False)): return False
+            self.meta.move_replica(chunk_id, src, dst, size)
+            self.retiring.append((time.monotonic() + SOURCE_GRACE, chunk_id, src))
+            return True
+        finally:
+            with m.chunk_lock: del m.inflight_chunks[chunk_id]
+            done.set()
+
+    def retire_due(self):
+        m = self.manager
+        while self.retiring and self.retiring[0][0] <= time.monotonic():
+            item = self.retiring.popleft()
+            _, chunk_id, node_id = item
+            if not m.reachable(node_id):
+                self.offline.append(item)
+                continue
+            with m.chunk_lock:
+                entry = self.meta.get_chunk(chunk_id)
+                if entry and node_id in entry['nodes']: continue # Placed back on that node since
+                if chunk_id in m.inflight_chunks: # Busy: try again shortly
+                    self.retiring.append((time.monotonic() + 1, chunk_id, node_id))
+                    continue
+                done = m.inflight_chunks[chunk_id] = threading.Event()
+            try: m.node_call(node_id, m.delete_from_node, chunk_id)
+            finally:
+                with m.chunk_lock: del m.inflight_chunks[chunk_id]
+                done.set()
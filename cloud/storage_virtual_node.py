@@ -1,15 +1,105 @@
+import asyncio
+import bisect
+import hashlib
+import zlib
 import socket
 import json
 import threading
-import struct
 import sys
 import os
 import time
-import base64
+from concurrent.futures import ThreadPoolExecutor
+import node_protocol as proto
+from node_index import NodeIndex, ExtentAllocator, PartitionFull
+from byte_cache import ByteLRUCache
+from health import HEARTBEAT_INTERVAL
+import chunk_codec
 
 DISK_FILE = "civic_cloud_disk.vfat"
 MANAGER_IP = "127.0.0.1"
 MANAGER_UDP_PORT = 9001
+# Largest piece moved per socket/disk syscall when streaming a chunk through the node
+IO_PIECE = 4 * 1024 * 1024
+# Hot chunks kept in memory; chunks bigger than a quarter of the budget are always served from disk
+CHUNK_CACHE_BYTES = int(os.getenv("CIVIC_NODE_CACHE_BYTES", 256 * 1024 * 1024))
+CHUNK_CACHE_MAX_ITEM = CHUNK_CACHE_BYTES // 4
+# Pending connections the OS queues for the node, and threads for blocking disk/journal I/O
+LISTEN_BACKLOG = int(os.getenv("CIVIC_NODE_BACKLOG", 1024))
+DISK_WORKERS = int(os.getenv("CIVIC_NODE_DISK_WORKERS", 8))
+# Compaction: every COMPACT_INTERVAL seconds, if the gaps deletes left below the last extent
+# exceed both limits, live chunks are moved down into them at up to COMPACT_RATE bytes/s
+COMPACT_INTERVAL = int(os.getenv("CIVIC_COMPACT_INTERVAL", 30))
+COMPACT_RATE = int(os.getenv("CIVIC_COMPACT_RATE", 32 * 1024 * 1024))
+COMPACT_MIN_GAP_BYTES = int(os.getenv("CIVIC_COMPACT_MIN_GAP_BYTES", 64 * 1024 * 1024))
+COMPACT_GAP_RATIO = float(os.getenv("CIVIC_COMPACT_GAP_RATIO", 0.25))
+# Chunks carry a CRC32 per CHECKSUM_BLOCK (IO_PIECE is a multiple of it), checked whenever
+# the bytes are read. The scrubber re-reads every chunk each SCRUB_INTERVAL seconds at up to
+# SCRUB_RATE bytes/s, pausing while the manager has requests in flight.
+CHECKSUM_BLOCK = 1024 * 1024
+SCRUB_INTERVAL = int(os.getenv("CIVIC_SCRUB_INTERVAL", 6 * 3600))
+SCRUB_RATE = int(os.getenv("CIVIC_SCRUB_RATE", 8 * 1024 * 1024))
+
+class ChecksumError(Exception):
+    pass
+
+def block_crcs(data):
+    view = memoryview(data)
+    return [zlib.crc32(view[i:i + CHECKSUM_BLOCK]) for i in range(0, len(view), CHECKSUM_BLOCK)]
+
+class VirtualDisk:
+    # One handle on the shared disk file for the node's lifetime, positional I/O only
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.lock = threading.Lock()
+
+    def fileno(self):
+        if self.fd is None:
+            with self.lock:
+                if self.fd is None: self.fd = os.open(self.path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        return self.fd
+
+    def pread(self, n, pos):
+        if hasattr(os, 'pread'): return os.pread(self.fileno(), n, pos)
+        with self.lock: # No pread on Windows: seek + read under the lock
+            os.lseek(self.fileno(), pos, os.SEEK_SET)
+            return os.read(self.fd, n)
+
+    def pwrite(self, data, pos):
+        view = memoryview(data)
+        while view:
+            if hasattr(os, 'pwrite'): n = os.pwrite(self.fileno(), view, pos)
+            else:
+                with self.lock:
+                    os.lseek(self.fileno(), pos, os.SEEK_SET)
+                    n = os.write(self.fd, view)
+            view, pos = view[n:], pos + n
+
+class PartitionMap:
+    # The slabs of the shared disk granted to this node, in grant order, seen as one range of
+    # logical offsets (what the FAT stores); an extent may straddle two slabs
+    def __init__(self):
+        self.slabs = []  # (disk offset, size)
+        self.starts = [] # Logical offset of each slab
+        self.size = 0
+
+    def assign(self, slabs):
+        slabs = [tuple(x) for x in slabs]
+        if slabs[:len(self.slabs)] != self.slabs: print("⚠️ Manager changed slabs this node already uses")
+        self.slabs, self.starts, self.size = slabs, [], 0
+        for _, size in slabs:
+            self.starts.append(self.size)
+            self.size += size
+
+    def pieces(self, pos, n):
+        # (disk offset, length) runs covering logical bytes [pos, pos + n)
+        i = bisect.bisect_right(self.starts, pos) - 1
+        while n > 0:
+            if not 0 <= i < len(self.slabs): raise IOError(f"Offset {pos} is outside this node's slabs")
+            disk, size = self.slabs[i]
+            k = min(n, size - (pos - self.starts[i]))
+            yield disk + pos - self.starts[i], k
+            pos, n, i = pos + k, n - k, i + 1
 
 class CivicNode:
     def __init__(self, node_id):
@@ -17,121 +107,355 @@ class CivicNode:
         self.ip = "127.0.0.1"
         self.port = 0
         
-        # Partition Info
-        self.partition_start = 0
-        self.partition_size = 0
-        self.write_cursor = 0 # Where to write next in my partition
+        # Partition Info: slabs granted by the manager, more as the node fills up
+        self.layout = PartitionMap()
         
-        # Local Index (FAT): ChunkID -> Relative Offset
-        self.index_file = f"node_{node_id}_index.json"
-        self.load_index()
-
-        os.system(f"title CivicNode {self.id}")
-
-    def load_index(self):
-        if os.path.exists(self.index_file):
-            with open(self.index_file, 'r') as f:
-                self.fat = json.load(f)
-                # Recover cursor position
-                if self.fat:
-                    last_chunk = list(self.fat.values())[-1]
-                    self.write_cursor = last_chunk['offset'] + last_chunk['size']
-        else:
-            self.fat = {}
+        # Local Index (FAT): ChunkID -> Relative Offset, journaled to disk
+        self.index = NodeIndex(f"node_{node_id}_index")
+        self.fat = self.index.fat
+        # Space in my partition; an extent only enters the FAT once its bytes are on disk
+        self.allocator = ExtentAllocator(self.fat.values())
+        self.writing = {} # chunk_id -> Future resolved when its in-progress write commits
+        self.readers = {} # chunk_id -> reads in flight; a freed extent is reused only once they finish
+        self.retired = {} # chunk_id -> [(offset, size)] extents waiting for those reads
+        self.disk = VirtualDisk(DISK_FILE)
+        self.cache = ByteLRUCache(CHUNK_CACHE_BYTES, CHUNK_CACHE_MAX_ITEM)
+        self.fill_locks = [threading.Lock() for _ in range(16)] # One disk load per missing chunk
+        self.io = ThreadPoolExecutor(DISK_WORKERS, thread_name_prefix="disk")
+        self.connections = self.ops = 0 # Load reported in heartbeats
+        self.scrubbed = {"passes": 0, "chunks": 0, "bytes": 0, "corrupt": 0}
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
-    def save_index(self):
-        with open(self.index_file, 'w') as f:
-            json.dump(self.fat, f)
+        if os.name == 'nt': os.system(f"title CivicNode {self.id}")
 
     def start_server(self):
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.bind((self.ip, 0))
-        self.port = server.getsockname()[1]
-        server.listen(5)
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        # One event loop multiplexes every manager connection; only disk and journal
+        # calls leave it, on the bounded self.io pool
+        server = await asyncio.start_server(self.handle_connection, self.ip, 0, backlog=LISTEN_BACKLOG)
+        self.port = server.sockets[0].getsockname()[1]
         
         print(f"🟢 Node {self.id} ONLINE | Port: {self.port}")
         
         # Announce existence to Manager
         self.announce()
+        asyncio.create_task(self.compact_forever())
+        asyncio.create_task(self.heartbeat_forever())
+        asyncio.create_task(self.scrub_forever())
         
+        async with server: await server.serve_forever()
+
+    def announce(self, kind="join"):
+        # extent_end tells the manager whether this node already holds data in a layout it must keep
+        load = {"connections": self.connections, "ops": self.ops, "free_bytes": self.allocator.free_bytes()}
+        self.tell_manager({"type": kind, "id": self.id, "port": self.port, "extent_end": self.allocator.end, "load": load})
+
+    def tell_manager(self, msg):
+        try: self.udp.sendto(json.dumps(msg).encode(), (MANAGER_IP, MANAGER_UDP_PORT))
+        except OSError as e: print(f"⚠️ Message to manager not sent: {e}")
+
+    async def heartbeat_forever(self):
+        # The manager marks a node suspect, then offline, when these stop arriving; a
+        # heartbeat from a node it dropped (or doesn't know after a restart) re-registers it
         while True:
-            client, addr = server.accept()
-            threading.Thread(target=self.handle_request, args=(client,), daemon=True).start()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self.announce("heartbeat")
+
+    async def skip_payload(self, reader, size):
+        # Reads and drops a payload the node won't store, keeping the connection in step
+        while size:
+            size -= len(await reader.readexactly(min(size, IO_PIECE)))
 
-    def announce(self):
-        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        msg = json.dumps({"type": "join", "id": self.id, "port": self.port})
-        udp.sendto(msg.encode(), (MANAGER_IP, MANAGER_UDP_PORT))
+    async def run_io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.io, fn, *args)
 
-    def handle_request(self, client):
+    async def handle_connection(self, reader, writer):
+        # Serves commands on this connection until the manager closes it
+        self.connections += 1
         try:
-            # Read Length
-            raw_len = client.recv(4)
-            if not raw_len: return
-            msg_len = struct.unpack('>I', raw_len)[0]
-            
-            # Read Payload
-            data = b""
-            while len(data) < msg_len:
-                packet = client.recv(msg_len - len(data))
-                if not packet: break
-                data += packet
-            
-            payload = json.loads(data.decode())
-            cmd = payload['command']
-
-            if cmd == 'ASSIGN_PARTITION':
-                self.partition_start = payload['offset']
-                self.partition_size = payload['size']
-                print(f"💾 Partition Assigned: Start={self.partition_start} | Size={self.partition_size/1024/1024}MB")
-
-            elif cmd == 'WRITE':
-                chunk_id = payload['chunk_id']
-                raw_data = base64.b64decode(payload['data'])
-                size = len(raw_data)
-                
-                # Write to Virtual Disk
-                with open(DISK_FILE, 'r+b') as f:
-                    # Seek to Absolute Position (Partition Start + Local Cursor)
-                    abs_pos = self.partition_start + self.write_cursor
-                    f.seek(abs_pos)
-                    f.write(raw_data)
-                
-                # Update Index
-                self.fat[chunk_id] = {'offset': self.write_cursor, 'size': size}
-                self.write_cursor += size
-                self.save_index()
+            while True:
+                try: frame = await proto.read_frame(reader)
+                except proto.ProtocolError:
+                    writer.write(proto.pack_header(0, status=proto.STATUS_BAD_VERSION))
+                    await writer.drain()
+                    raise
+                if frame is None: return
+                self.ops += 1
+                try:
+                    await self.handle_frame(reader, writer, frame)
+                    await writer.drain()
+                finally: self.ops -= 1
+        except Exception as e:
+            print(f"Error: {e}")
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def handle_frame(self, reader, writer, frame):
+        cmd = frame.command
+
+        if cmd == proto.ASSIGN_PARTITION:
+            self.layout.assign(json.loads(await reader.readexactly(frame.length))['slabs'])
+            self.allocator.capacity = self.layout.size
+            print(f"💾 Partition Assigned: {len(self.layout.slabs)} slabs | Size={self.layout.size/1024/1024}MB")
+            writer.write(proto.pack_header(cmd))
+
+        elif cmd == proto.WRITE:
+            chunk_id = frame.key
+            size = frame.length
+            if chunk_id in self.fat or chunk_id in self.writing:
+                # Chunks are content-addressed: the stored (or in-progress) copy is already this data
+                await self.skip_payload(reader, size)
+                ok = chunk_id in self.fat or await asyncio.shield(self.writing[chunk_id])
+                writer.write(proto.pack_header(cmd, status=proto.STATUS_OK if ok else proto.STATUS_ERROR))
+                return
+            codec = chunk_codec.CODEC_NAMES.get(frame.arg0)
+            if codec is None or not chunk_codec.available(codec):
+                await self.skip_payload(reader, size)
+                writer.write(proto.pack_header(cmd, status=proto.STATUS_ERROR))
+                return
+            # Reserve the extent atomically; the disk writes of concurrent WRITEs then run in parallel
+            try: offset = self.allocator.reserve(size)
+            except PartitionFull as e:
+                print(f"⚠️ {e}")
+                await self.skip_payload(reader, size)
+                writer.write(proto.pack_header(cmd, arg0=self.layout.size, status=proto.STATUS_FULL))
+                return
+            committed = asyncio.get_running_loop().create_future()
+            self.writing[chunk_id] = committed
+            try:
+                # Socket -> disk in IO_PIECE steps, so memory does not grow with chunk size
+                pos, remaining, crcs = offset, size, []
+                while remaining:
+                    piece = await reader.readexactly(min(remaining, IO_PIECE))
+                    crcs += await self.run_io(self.store_piece, piece, pos)
+                    pos, remaining = pos + len(piece), remaining - len(piece)
                 
-                print(f"📝 Wrote {size}b to disk offset {abs_pos}")
-                client.send("OK".encode())
+                # Update Index, now that the bytes are there. size is as stored; compressed
+                # chunks also record their codec and uncompressed size
+                entry = {'offset': offset, 'size': size, 'crc': crcs}
+                if codec != "none": entry.update(codec=codec, raw=frame.arg1)
+                await self.run_io(self.index.put, chunk_id, entry)
+                committed.set_result(True)
+            except BaseException:
+                self.allocator.release(offset, size)
+                committed.set_result(False)
+                raise
+            finally:
+                del self.writing[chunk_id]
+            
+            print(f"📝 Wrote {size}b at node offset {offset}")
+            writer.write(proto.pack_header(cmd))
 
-            elif cmd == 'READ':
-                chunk_id = payload['chunk_id']
-                if chunk_id in self.fat:
-                    meta = self.fat[chunk_id]
+        elif cmd == proto.READ:
+            chunk_id = frame.key
+            if chunk_id in self.fat:
+                meta = self.fat[chunk_id]
+                # Optional sub-range of the chunk (length 0 = to the end), in uncompressed bytes
+                raw_size = meta.get('raw', meta['size'])
+                start = min(frame.arg0, raw_size)
+                length = min(frame.arg1 or raw_size - start, raw_size - start)
+                header = proto.pack_header(cmd, chunk_id, start, length, length)
+                sent = False # Whether the reply header is out
+                self.pin(chunk_id)
+                try:
+                    cached = self.cache.get(chunk_id)
+                    if cached is None and ('codec' in meta or self.cache.admits(meta['size'])):
+                        # Compressed chunks are always inflated whole (and cached if they fit)
+                        cached = await self.run_io(self.load_chunk, chunk_id, meta)
+                    if cached is not None:
+                        writer.write(header + memoryview(cached)[start:start + length])
+                        return
                     
-                    with open(DISK_FILE, 'rb') as f:
-                        abs_pos = self.partition_start + meta['offset']
-                        f.seek(abs_pos)
-                        raw_data = f.read(meta['size'])
-                    
-                    resp = json.dumps({
-                        "status": "OK",
-                        "data": base64.b64encode(raw_data).decode()
-                    })
-                    print(f"📖 Read {meta['size']}b from disk offset {abs_pos}")
+                    if 'crc' not in meta:
+                        # Indexed before checksums: disk -> socket via sendfile (own handle, so no shared file position)
+                        writer.write(header)
+                        with open(self.disk.path, 'rb', buffering=0) as f:
+                            for disk_pos, n in self.layout.pieces(meta['offset'] + start, length):
+                                await asyncio.get_running_loop().sendfile(writer.transport, f, disk_pos, n)
+                        return
+                    # Too big to cache: checked piece by piece; the header waits for the first piece
+                    async for piece in self.read_checked(meta, start, length):
+                        if not sent: writer.write(header)
+                        sent = True
+                        writer.write(piece)
+                        await writer.drain()
+                    if not sent: writer.write(header)
+                    print(f"📖 Read {length}b at node offset {meta['offset'] + start}")
+                except ChecksumError as e:
+                    print(f"❌ Chunk {chunk_id[:12]}: {e}")
+                    await self.quarantine(chunk_id, meta)
+                    if sent: raise # Part of the reply is out: dropping the connection fails the read
+                    writer.write(proto.pack_header(cmd, chunk_id, status=proto.STATUS_CORRUPT))
+                finally: self.unpin(chunk_id)
+            else:
+                writer.write(proto.pack_header(cmd, chunk_id, status=proto.STATUS_NOT_FOUND))
+
+        elif cmd == proto.PING:
+            writer.write(proto.pack_header(cmd))
+
+        elif cmd == proto.DELETE:
+            chunk_id = frame.key
+            if chunk_id in self.writing: await asyncio.shield(self.writing[chunk_id])
+            entry = await self.run_io(self.index.delete, chunk_id)
+            self.cache.discard(chunk_id)
+            if entry:
+                self.retire(chunk_id, entry)
+                print(f"🗑️ Deleted {entry['size']}b at partition offset {entry['offset']}")
+            writer.write(proto.pack_header(cmd, chunk_id, status=proto.STATUS_OK if entry else proto.STATUS_NOT_FOUND))
+
+        elif cmd == proto.STATS:
+            payload = json.dumps({"cache": self.cache.stats(), "free_bytes": self.allocator.free_bytes(), "gap_bytes": self.allocator.gap_bytes(), "scrub": self.scrubbed}).encode()
+            writer.write(proto.pack_header(cmd, length=len(payload)) + payload)
+
+        else:
+            writer.write(proto.pack_header(cmd, status=proto.STATUS_ERROR))
+
+    # --- EXTENT LIFETIME (event loop only) ---
+    def pin(self, chunk_id):
+        self.readers[chunk_id] = self.readers.get(chunk_id, 0) + 1
+
+    def unpin(self, chunk_id):
+        self.readers[chunk_id] -= 1
+        if self.readers[chunk_id]: return
+        del self.readers[chunk_id]
+        for offset, size in self.retired.pop(chunk_id, ()): self.allocator.release(offset, size)
+
+    def retire(self, chunk_id, entry):
+        # Frees an extent the FAT no longer points at, once no read of it is in flight
+        if chunk_id in self.readers: self.retired.setdefault(chunk_id, []).append((entry['offset'], entry['size']))
+        else: self.allocator.release(entry['offset'], entry['size'])
+
+    # --- COMPACTION ---
+    async def compact_forever(self):
+        while True:
+            await asyncio.sleep(COMPACT_INTERVAL)
+            try: await self.compact()
+            except Exception as e: print(f"⚠️ Compaction failed: {e}")
+
+    async def compact(self):
+        # Moves the highest chunks down into the lowest gaps that fit, so free space
+        # collects at the end of the partition where any size of write can use it
+        gaps = self.allocator.gap_bytes()
+        if gaps < COMPACT_MIN_GAP_BYTES or gaps < COMPACT_GAP_RATIO * self.allocator.end: return
+        print(f"🧹 Compacting: {gaps}b of gaps below offset {self.allocator.end}")
+        moved = 0
+        for chunk_id, entry in sorted(self.fat.items(), key=lambda x: -x[1]['offset']):
+            if not self.allocator.gap_bytes(): break
+            if self.fat.get(chunk_id) is not entry: continue # Deleted or moved meanwhile
+            offset = self.allocator.reserve(entry['size'], below=entry['offset'])
+            if offset is None: continue
+            new = dict(entry, offset=offset)
+            done = 0
+            while done < entry['size']:
+                n = min(IO_PIECE, entry['size'] - done)
+                data = await self.run_io(self.read_at, n, entry['offset'] + done)
+                await self.run_io(self.write_at, data, offset + done)
+                done += n
+                await asyncio.sleep(n / COMPACT_RATE)
+            if await self.run_io(self.index.move, chunk_id, entry, new):
+                self.retire(chunk_id, entry)
+                moved += entry['size']
+            else: self.allocator.release(offset, entry['size'])
+        print(f"🧹 Compaction moved {moved}b; partition now ends at {self.allocator.end}")
+
+    # --- CHECKSUMS ---
+    async def read_checked(self, meta, start, length):
+        # Yields the chunk's bytes [start, start + length) in pieces of up to IO_PIECE, each read
+        # as whole checksum blocks and verified; raises ChecksumError on a mismatch
+        pos, end = start, start + length
+        while pos < end:
+            lo = pos - pos % CHECKSUM_BLOCK
+            hi = min(lo + IO_PIECE, meta['size'])
+            data = await self.run_io(self.read_blocks, meta, lo, hi - lo)
+            yield memoryview(data)[pos - lo:min(end, hi) - lo]
+            pos = min(end, hi)
+
+    def read_blocks(self, meta, lo, n):
+        # Bytes [lo, lo + n) of a chunk, lo on a block boundary; runs on self.io
+        data = self.read_at(n, meta['offset'] + lo)
+        first = lo // CHECKSUM_BLOCK
+        if block_crcs(data) != meta['crc'][first:first + len(range(0, n, CHECKSUM_BLOCK))]:
+            raise ChecksumError(f"checksum mismatch in {n}b at node offset {meta['offset'] + lo}")
+        return data
+
+    async def quarantine(self, chunk_id, entry):
+        # A copy that failed its checksum leaves the index, so it is never served again, and is
+        # reported to the manager, which writes a good copy back from another replica or the stripe
+        removed = await self.run_io(self.index.delete, chunk_id, entry)
+        if not removed: return
+        self.cache.discard(chunk_id)
+        self.retire(chunk_id, removed)
+        self.scrubbed['corrupt'] += 1
+        self.tell_manager({"type": "corrupt", "id": self.id, "chunk": chunk_id})
+
+    async def scrub_forever(self):
+        while True:
+            await asyncio.sleep(SCRUB_INTERVAL)
+            try: await self.scrub()
+            except Exception as e: print(f"⚠️ Scrub failed: {e}")
+
+    async def scrub(self):
+        # Re-reads every chunk in disk order and quarantines the ones that fail their checksums.
+        # Chunks indexed before checksums existed get them now, after a check against their
+        # sha256 id (when the id is one).
+        found = self.scrubbed['corrupt']
+        for chunk_id, entry in sorted(self.fat.items(), key=lambda x: x[1]['offset']):
+            if self.fat.get(chunk_id) is not entry: continue # Deleted or moved meanwhile
+            crcs, sha = [], hashlib.sha256()
+            self.pin(chunk_id)
+            try:
+                for lo in range(0, entry['size'], IO_PIECE):
+                    while self.ops: await asyncio.sleep(0.05) # Foreground requests go first
+                    n = min(IO_PIECE, entry['size'] - lo)
+                    crcs += await self.run_io(self.scrub_piece, n, entry['offset'] + lo, None if 'crc' in entry else sha)
+                    self.scrubbed['bytes'] += n
+                    await asyncio.sleep(n / SCRUB_RATE)
+                self.scrubbed['chunks'] += 1
+                if 'crc' in entry: intact = crcs == entry['crc']
                 else:
-                    resp = json.dumps({"status": "ERROR"})
-                
-                # Send response
-                encoded = resp.encode()
-                client.send(struct.pack('>I', len(encoded)))
-                client.send(encoded)
+                    intact = len(chunk_id) != 64 or sha.hexdigest() == chunk_id
+                    if intact: await self.run_io(self.index.move, chunk_id, entry, dict(entry, crc=crcs))
+                if not intact:
+                    print(f"❌ Scrub: chunk {chunk_id[:12]} at node offset {entry['offset']} is corrupt")
+                    await self.quarantine(chunk_id, entry)
+            finally: self.unpin(chunk_id)
+        self.scrubbed['passes'] += 1
+        print(f"🔍 Scrub pass done: {len(self.fat)} chunks, {self.scrubbed['corrupt'] - found} corrupt")
 
-        except Exception as e:
-            print(f"Error: {e}")
-        finally:
-            client.close()
+    def scrub_piece(self, n, pos, sha=None):
+        data = self.read_at(n, pos)
+        if sha: sha.update(data)
+        return block_crcs(data)
+
+    # --- DISK I/O at node (logical) offsets, run on self.io ---
+    def read_at(self, n, pos):
+        return b"".join(self.disk.pread(k, disk_pos) for disk_pos, k in self.layout.pieces(pos, n))
+
+    def store_piece(self, data, pos):
+        # Writes one piece of an incoming chunk and returns its block checksums
+        self.write_at(data, pos)
+        return block_crcs(data)
+
+    def write_at(self, data, pos):
+        view = memoryview(data)
+        for disk_pos, k in self.layout.pieces(pos, len(view)):
+            self.disk.pwrite(view[:k], disk_pos)
+            view = view[k:]
+
+    def load_chunk(self, chunk_id, meta):
+        # Runs on self.io after a cache miss; parallel misses on one chunk load it once.
+        # Returns the chunk uncompressed.
+        with self.fill_locks[hash(chunk_id) % len(self.fill_locks)]:
+            data = self.cache.get(chunk_id, count=False)
+            if data is None:
+                data = self.read_blocks(meta, 0, meta['size']) if 'crc' in meta else self.read_at(meta['size'], meta['offset'])
+                if 'codec' in meta: data = chunk_codec.decompress(data, meta['codec'])
+                self.cache.put(chunk_id, data)
+                print(f"📖 Cached {meta['size']}b chunk from node offset {meta['offset']}")
+        return data
 
 if __name__ == "__main__":
     node = CivicNode(sys.argv[1])